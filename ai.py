@@ -1,68 +1,63 @@
 import json
 import numpy as np
 import logging
-from keras.models import Sequential
-# from keras.layers.convolutional import Convolution2D, MaxPooling2D
 
-from keras.layers import Dense, Dropout, Conv2D, Conv1D
-from keras.optimizers import sgd
-
-import matplotlib.pyplot as plt
-
-
-from game import Game
+from vectorEnv import VectorEnv, maskedArgmax, randomValidActions
+from neuralAI import saveWeights
 
 # Implementation based on https://edersantana.github.io/articles/keras_rl/
 # More description here https://ai.intel.com/demystifying-deep-reinforcement-learning/
 
 class ExperienceReplay(object):
+    # Ring buffer of transitions in preallocated arrays, allocated on the first
+    # remember() call once the state size is known
     def __init__(self, max_memory=100, discount=.9):
         self.max_memory = max_memory
-        self.memory = list()
         self.discount = discount
+        self.size = 0
+        self.next_idx = 0 # slot the next transition is written to (overwriting the oldest once full)
+        self.states_t = None
+
+    def __len__(self):
+        return self.size
 
     def remember(self, states, game_over):
-        # memory[i] = [[state_t, action_t, reward_t, state_t+1], game_over?]
-        self.memory.append([states, game_over])
-        if len(self.memory) > self.max_memory:
-            del self.memory[0]
+        # states = [state_t, action_t, reward_t, state_t+1]
+        state_t, action_t, reward_t, state_tp1 = states
+        if self.states_t is None:
+            env_dim = np.asarray(state_t).size
+            self.states_t = np.zeros((self.max_memory, env_dim))
+            self.actions = np.zeros(self.max_memory, dtype=int)
+            self.rewards = np.zeros(self.max_memory)
+            self.states_tp1 = np.zeros((self.max_memory, env_dim))
+            self.game_overs = np.zeros(self.max_memory, dtype=bool)
+        i = self.next_idx
+        self.states_t[i] = np.ravel(state_t)
+        self.actions[i] = action_t
+        self.rewards[i] = reward_t
+        self.states_tp1[i] = np.ravel(state_tp1)
+        self.game_overs[i] = game_over
+        self.next_idx = (i + 1) % self.max_memory
+        self.size = min(self.size + 1, self.max_memory)
 
     def get_batch(self, model, batch_size=10):
-        len_memory = len(self.memory)
-        num_actions = model.output_shape[-1]
-        env_dim = self.memory[0][0][0].shape[1]
-        inputs = np.zeros((min(len_memory, batch_size), env_dim))
-        targets = np.zeros((inputs.shape[0], num_actions))
-        for i, idx in enumerate(np.random.randint(0, len_memory,
-                                                  size=inputs.shape[0])):
-            state_t, action_t, reward_t, state_tp1 = self.memory[idx][0]
-            game_over = self.memory[idx][1]
-
-            inputs[i:i+1] = state_t
-            # There should be no target values for actions not taken.
-            # Thou shalt not correct actions not taken #deep
-            targets[i] = model.predict(state_t)[0]
-            Q_sa = np.max(model.predict(state_tp1)[0])
-            if game_over:  # if game_over is True
-                targets[i, action_t] = reward_t
-            else:
-                # reward_t + gamma * max_a' Q(s', a')
-                targets[i, action_t] = reward_t + self.discount * Q_sa
+        idx = np.random.randint(0, self.size, size=min(self.size, batch_size))
+        inputs = self.states_t[idx]
+        # There should be no target values for actions not taken.
+        # Thou shalt not correct actions not taken #deep
+        # One forward pass for all of the sampled states and one for all of the next states
+        targets = model.predict(inputs)
+        Q_sa = np.max(model.predict(self.states_tp1[idx]), axis=1)
+        # reward_t + gamma * max_a' Q(s', a'), or just reward_t if the game ended
+        targets[np.arange(len(idx)), self.actions[idx]] = self.rewards[idx] + self.discount * Q_sa * ~self.game_overs[idx]
         return inputs, targets
 
-if __name__ == "__main__":
-
-    logging.basicConfig(level=logging.INFO)
-
-    # parameters
-    epsilon = .1  # exploration
-    epoch = 300
-    max_memory = 1
-    discount = 0 #future moves don't really get benefit from current move
-    hidden_size = 150
-    batch_size = 10
-    grid_size = 8
-    num_actions = grid_size**2  # anywhere in grid
+# Keras (and tensorflow) are only imported once a model is actually built
+def build_model(grid_size, hidden_size, num_actions):
+    from keras.models import Sequential
+    # from keras.layers.convolutional import Convolution2D, MaxPooling2D
+    from keras.layers import Dense, Dropout, Conv2D, Conv1D
+    from keras.optimizers import sgd
 
     model = Sequential()
     # model.add(Conv2D(64, 3,
@@ -77,12 +72,32 @@ if __name__ == "__main__":
     model.compile(sgd(lr=.05), "mse")
 
     # model.add(Dropout(0.5))
+    return model
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    logging.basicConfig(level=logging.INFO)
+
+    # parameters
+    epsilon = .1  # exploration
+    epoch = 300
+    num_envs = 16 # games played in lockstep, one forward pass picks the moves for all of them
+    history = 100 # steps of experience kept, each step stores a transition per environment
+    max_memory = num_envs * history
+    discount = 0 #future moves don't really get benefit from current move
+    hidden_size = 150
+    batch_size = 4 * num_envs # each stored transition is trained on about 4 times
+    grid_size = 8
+    num_actions = grid_size**2  # anywhere in grid
+
+    model = build_model(grid_size, hidden_size, num_actions)
 
     # If you want to continue training from a previous model, just uncomment the line bellow
     # model.load_weights("model.h5")
 
-    # Define environment/game
-    env = Game(numPlayers = 1, playerTypes = ['AI'], rows=grid_size, columns=grid_size, ships = [2,3,3,4,5], showDisplay=False)
+    # Define environments/games
+    env = VectorEnv(num_envs, 'AI', grid_size, grid_size, [2,3,3,4,5])
 
     # Initialize experience replay object
     exp_replay = ExperienceReplay(max_memory=max_memory,discount = discount)
@@ -90,50 +105,39 @@ if __name__ == "__main__":
     turnNums = []
 
     # Train
-    for e in range(epoch):
-        loss = 0.
-        env.reset()
-        game_over = False
-        # get initial input
-        input_t = env.observe()
-        turnNum = 0
-        while not game_over:
-            input_tm1 = input_t
-
-            # get next action
-            if np.random.rand() <= epsilon:
-                # action = np.random.randint(0, num_actions)
-                validPosition = False
-                while not validPosition:
-                    action = np.random.randint(0, num_actions)
-                    position = [action // env.columns, action % env.columns]
-                    validPosition = env.board.isValidShot(position)
-            else:
-                q = model.predict(input_tm1)
-                # action = np.argmax(q[0])
-                qSortedDescending = np.argsort(q[0])[::-1]
-                i = 0
-                validPosition = False
-                while not validPosition:
-                    action = qSortedDescending[i]
-                    position = [action // env.columns, action % env.columns]
-                    validPosition = env.board.isValidShot(position)
-                    i += 1
-
-
-            # apply action, get rewards and new state
-            input_t, reward, game_over = env.act(action)
-
-            # store experience
-            exp_replay.remember([input_tm1, action, reward, input_t], game_over)
-
-            # adapt model
-            inputs, targets = exp_replay.get_batch(model, batch_size=batch_size)
-
-            loss += model.train_on_batch(inputs, targets)
-            turnNum += 1
-        print("Epoch {:03d}/{} | Loss {:.4f} | Turn count: {}".format(e, epoch-1, loss, turnNum))
-        turnNums.append(turnNum)
+    input_t, valid_actions = env.reset()
+    turn_counts = np.zeros(num_envs, dtype=int)
+    e = 0
+    # loss over each environment's current game, every training step counts towards all of
+    # the games it was taken during (one game of one environment was the old loop's epoch)
+    losses = np.zeros(num_envs)
+    while e < epoch:
+        input_tm1 = input_t
+
+        # get next actions, cells that were already shot are masked out
+        q = model.predict(input_tm1)
+        actions = maskedArgmax(q, valid_actions)
+        explore = np.random.rand(num_envs) <= epsilon
+        actions[explore] = randomValidActions(valid_actions[explore])
+
+        # apply actions, get rewards and new states (finished games restart automatically)
+        next_states, rewards, game_overs, input_t, valid_actions = env.step(actions)
+
+        # store experience
+        for i in range(num_envs):
+            exp_replay.remember([input_tm1[i:i+1], actions[i], rewards[i], next_states[i:i+1]], game_overs[i])
+
+        # adapt model
+        inputs, targets = exp_replay.get_batch(model, batch_size=batch_size)
+
+        losses += model.train_on_batch(inputs, targets)
+        turn_counts += 1
+        for i in np.flatnonzero(game_overs):
+            print("Epoch {:03d}/{} | Loss {:.4f} | Turn count: {}".format(e, epoch-1, losses[i], turn_counts[i]))
+            turnNums.append(turn_counts[i])
+            turn_counts[i] = 0
+            losses[i] = 0.
+            e += 1
 
     plt.plot(turnNums)
     plt.ylabel('Turns to finish game')
@@ -141,5 +145,6 @@ if __name__ == "__main__":
 
     # Save trained model weights and architecture, this will be used by the visualization code
     model.save_weights("model.h5", overwrite=True)
+    saveWeights(model.get_weights(), "model.npz") #what the NN player type loads, without keras
     with open("model.json", "w") as outfile:
         json.dump(model.to_json(), outfile)
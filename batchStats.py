@@ -0,0 +1,119 @@
+import csv
+import json
+import math
+from collections import Counter
+
+from instrumentation import Instrumentation
+
+# Online statistics and incremental output for streams of gameReports
+# (see GameBatch.iterGames/runGames), so a batch never has to keep its results in memory.
+
+class RunningStats:
+    # Welford's online mean/variance
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self):
+        return math.sqrt(self.variance())
+
+    def halfWidth(self, z=1.96):
+        #half width of the normal approximation confidence interval of the mean
+        return z * self.stdev() / math.sqrt(self.count) if self.count > 1 else math.inf
+
+
+class BatchStats:
+    def __init__(self, playerTypes):
+        self.playerTypes = list(playerTypes)
+        self.moves = RunningStats()
+        self.movesHistogram = Counter()
+        self.wins = Counter()
+        self.instrumentation = None #totals of gameReport['instrumentation'] for instrumented batches
+
+    @property
+    def numGames(self):
+        return self.moves.count
+
+    def add(self, gameReport):
+        self.moves.add(gameReport['winnerNumMoves'])
+        self.movesHistogram[gameReport['winnerNumMoves']] += 1
+        self.wins[gameReport['winnerPlayerNum']] += 1
+        if 'instrumentation' in gameReport:
+            if self.instrumentation is None:
+                self.instrumentation = Instrumentation()
+            self.instrumentation.merge(gameReport['instrumentation'])
+
+    def playerLabel(self, playerNum):
+        return '%s:%s' % (playerNum, self.playerTypes[playerNum-1])
+
+    def winRate(self, playerNum=1):
+        return self.wins[playerNum] / self.numGames if self.numGames else 0.0
+
+    def winRateHalfWidth(self, playerNum=1, z=1.96):
+        # Wilson score interval, which unlike the normal approximation doesn't collapse to 0
+        # when one side has won (or lost) every game so far
+        if self.numGames < 2:
+            return math.inf
+        n = self.numGames
+        p = self.winRate(playerNum)
+        return z / (1 + z * z / n) * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+
+    def isConfident(self, meanMovesHalfWidth=None, winRateHalfWidth=None, minGames=30, z=1.96):
+        # True once every requested confidence interval is narrower than its target
+        if self.numGames < minGames or (meanMovesHalfWidth is None and winRateHalfWidth is None):
+            return False
+        if meanMovesHalfWidth is not None and self.moves.halfWidth(z) > meanMovesHalfWidth:
+            return False
+        if winRateHalfWidth is not None and self.winRateHalfWidth(1, z) > winRateHalfWidth:
+            return False
+        return True
+
+    def summary(self, z=1.96):
+        summary = {'numGames': self.numGames,
+                'meanMoves': self.moves.mean,
+                'stdevMoves': self.moves.stdev(),
+                'meanMovesHalfWidth': self.moves.halfWidth(z),
+                'movesHistogram': dict(sorted(self.movesHistogram.items())),
+                'winRate': dict((self.playerLabel(num), self.winRate(num)) for num in range(1, len(self.playerTypes) + 1)),
+                'winRateHalfWidth': self.winRateHalfWidth(1, z)}
+        if self.instrumentation is not None:
+            summary['instrumentation'] = self.instrumentation.summary()
+        return summary
+
+
+class JsonlSink:
+    # Appends one JSON object per game (binary game records are left to gameRecord.GameRecordWriter)
+    def __init__(self, path):
+        self.file = open(path, 'a')
+
+    def write(self, gameReport):
+        self.file.write(json.dumps(dict((key, value) for key, value in gameReport.items() if key != 'record')) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class CsvSink:
+    FIELDS = ['winnerPlayerNum', 'winnerNumMoves']
+
+    def __init__(self, path):
+        self.file = open(path, 'a', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=CsvSink.FIELDS, extrasaction='ignore')
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def write(self, gameReport):
+        self.writer.writerow(gameReport)
+
+    def close(self):
+        self.file.close()
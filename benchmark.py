@@ -0,0 +1,195 @@
+import sys
+import json
+import random
+import argparse
+import platform
+import statistics
+from time import perf_counter
+import numpy as np
+
+from game import Game, Player, PlayerBoard
+from bitBoard import BitPlayerBoard
+from ruleBasedAI import RuleAI
+from probabilityAI import ProbabilityAI
+from ai import ExperienceReplay
+
+# Timing benchmarks for the engine and AI hot paths.
+#
+#   $ python3 benchmark.py --output results.json
+#   $ python3 benchmark.py --save-baseline          # writes benchmarkBaseline.json
+#   $ python3 benchmark.py --baseline benchmarkBaseline.json --tolerance 0.25
+#
+# Each benchmark is a function that does its (untimed) setup and returns the
+# callable to time, it's called again for every repeat so each timed run starts
+# from the same kind of state. Everything is seeded, so runs are comparable.
+
+SHIPS = [2,3,3,4,5]
+
+def seedEverything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+def newBoard(size, boardClass=PlayerBoard):
+    return boardClass(size, size, Player(1, 'RANDOM', size, size), SHIPS, False)
+
+def benchPlacement(size):
+    def setup():
+        board = newBoard(size)
+        def run():
+            board.grid.fill(0)
+            board.randomBoatPlacement()
+        return run
+    return setup
+
+def benchShootAll(size, boardClass=PlayerBoard):
+    #isValidShot + shoot on every cell of a fresh board
+    def setup():
+        board = newBoard(size, boardClass)
+        cells = [[row, col] for row in range(size) for col in range(size)]
+        random.shuffle(cells)
+        def run():
+            for cell in cells:
+                if board.isValidShot(cell):
+                    board.shoot(cell)
+        return run
+    return setup
+
+def ruleAIWithQueue(size, queueLength):
+    ai = RuleAI(size, size, 'AI')
+    ai.epsilon = 0
+    cells = [[row, col, 0] for row in range(size) for col in range(size)]
+    random.shuffle(cells)
+    for cell in cells[:queueLength]:
+        ai.addMoveToQueue(cell, 0)
+    return ai, cells[queueLength:]
+
+def benchGetBestMove(size, queueLength):
+    #one decision right after a shot, with queueLength moves waiting
+    def setup():
+        ai, unqueued = ruleAIWithQueue(size, queueLength + 1)
+        ai.postExecution(ai.getBestMove(), True)
+        return ai.getBestMove
+    return setup
+
+def benchPostExecution(size, queueLength):
+    def setup():
+        ai, unqueued = ruleAIWithQueue(size, queueLength)
+        move = unqueued[0]
+        return lambda: ai.postExecution(move, True)
+    return setup
+
+def benchProbabilityMove(size):
+    #shot, update and next decision for the probability density AI
+    def setup():
+        ai = ProbabilityAI(size, size, 'PROB', random, SHIPS)
+        for i in range(size):
+            ai.postExecution([i, (i * 3) % size], i % 3 == 0)
+        move = ai.getNextMove()
+        def run():
+            ai.postExecution(move, False)
+            ai.getNextMove()
+        return run
+    return setup
+
+def benchPlayGame(numPlayers, playerTypes, size, numGames=5):
+    def setup():
+        seeds = list(range(numGames))
+        def run():
+            for seed in seeds:
+                Game(numPlayers, playerTypes, size, size, SHIPS, False, seed=seed).playGame()
+        return run
+    return setup
+
+class LinearModel:
+    # Stand in for the keras model, so get_batch is timed without the cost of keras itself
+    def __init__(self, numInputs, numActions):
+        self.output_shape = (None, numActions)
+        self.weights = np.random.rand(numInputs, numActions)
+
+    def predict(self, inputs):
+        return np.dot(inputs, self.weights)
+
+def benchGetBatch(maxMemory, batchSize, size=8):
+    def setup():
+        replay = ExperienceReplay(max_memory=maxMemory, discount=.9)
+        for i in range(maxMemory):
+            replay.remember([np.random.rand(1, size*size), i % (size*size), 1.0, np.random.rand(1, size*size)], i % 50 == 0)
+        model = LinearModel(size*size, size*size)
+        return lambda: replay.get_batch(model, batch_size=batchSize)
+    return setup
+
+BENCHMARKS = [
+    ('placement_8x8', benchPlacement(8)),
+    ('placement_32x32', benchPlacement(32)),
+    ('shootAll_8x8', benchShootAll(8)),
+    ('shootAll_32x32', benchShootAll(32)),
+    ('shootAll_8x8_bitboard', benchShootAll(8, BitPlayerBoard)),
+    ('shootAll_32x32_bitboard', benchShootAll(32, BitPlayerBoard)),
+    ('getBestMove_8x8_queue8', benchGetBestMove(8, 8)),
+    ('getBestMove_8x8_queue48', benchGetBestMove(8, 48)),
+    ('getBestMove_32x32_queue512', benchGetBestMove(32, 512)),
+    ('postExecution_8x8', benchPostExecution(8, 8)),
+    ('postExecution_32x32', benchPostExecution(32, 512)),
+    ('probabilityMove_8x8', benchProbabilityMove(8)),
+    ('probabilityMove_32x32', benchProbabilityMove(32)),
+    ('playGame_1P_AI_8x8', benchPlayGame(1, ['AI'], 8)),
+    ('playGame_2P_AI_RANDOM_8x8', benchPlayGame(2, ['AI', 'RANDOM'], 8)),
+    ('playGame_1P_AI_16x16', benchPlayGame(1, ['AI'], 16)),
+    ('playGame_2P_AI_RANDOM_16x16', benchPlayGame(2, ['AI', 'RANDOM'], 16)),
+    ('playGame_1P_PROB_8x8', benchPlayGame(1, ['PROB'], 8)),
+    ('getBatch_memory1000_batch32', benchGetBatch(1000, 32)),
+    ('getBatch_memory100000_batch256', benchGetBatch(100000, 256)),
+]
+
+def runBenchmark(setup, repeat, seed):
+    seedEverything(seed)
+    timings = []
+    for i in range(repeat):
+        run = setup()
+        start = perf_counter()
+        run()
+        timings.append(perf_counter() - start)
+    return {'min': min(timings), 'median': statistics.median(timings), 'repeat': repeat}
+
+def compareToBaseline(results, baseline, tolerance):
+    # A benchmark regresses when its fastest run is more than tolerance slower than the baseline's
+    regressions = []
+    for name, result in results.items():
+        if name in baseline['results']:
+            ratio = result['min'] / baseline['results'][name]['min']
+            if ratio > 1 + tolerance:
+                regressions.append((name, ratio))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the engine and AI hot paths.')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='')
+    parser.add_argument('--filter', type=str, default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', type=str, default=None, help='write the results as JSON to this file')
+    parser.add_argument('--baseline', type=str, default=None, help='compare against the results in this file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown relative to the baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to benchmarkBaseline.json')
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup in BENCHMARKS:
+        if args.filter in name:
+            results[name] = runBenchmark(setup, args.repeat, args.seed)
+            print('%-32s min %10.1fus   median %10.1fus' % (name, results[name]['min'] * 1e6, results[name]['median'] * 1e6))
+
+    report = {'python': platform.python_version(), 'numpy': np.__version__, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+    if args.save_baseline:
+        with open('benchmarkBaseline.json', 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as infile:
+            baseline = json.load(infile)
+        regressions = compareToBaseline(results, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print('REGRESSION %s: %.2fx the baseline' % (name, ratio))
+        sys.exit(1 if regressions else 0)
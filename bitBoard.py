@@ -0,0 +1,111 @@
+import numpy as np
+
+from game import PlayerBoard
+
+# Cell (row, col) is bit row*columns + col of a python int, so a whole board
+# (ship occupancy, one ship, shots taken, hits) fits in a single integer.
+
+def bitsToArray(bits, size):
+    numBytes = (size + 7) // 8
+    byteArray = np.frombuffer(bits.to_bytes(numBytes, 'little'), dtype=np.uint8)
+    #unpackbits is most significant bit first, flip each byte to get bit i at index i
+    return np.unpackbits(byteArray).reshape(-1, 8)[:, ::-1].ravel()[:size].astype(bool)
+
+class BitPlayerBoard(PlayerBoard):
+    def initCells(self):
+        self.occupied = 0
+        self.shipMasks = [0] * self.numShips
+        self.shots = 0
+        self.hits = 0
+        self.verticalMasks = {}
+
+    def clearCells(self):
+        #shipMasks are all overwritten by the next placement
+        self.occupied = 0
+        self.shots = 0
+        self.hits = 0
+
+    def cellBit(self, position):
+        return 1 << int(position[0] * self.columns + position[1])
+
+    def placementMask(self, position, length, heading):
+        start = int(position[0] * self.columns + position[1])
+        length = int(length)
+        if heading == "horizontal":
+            return ((1 << length) - 1) << start
+        elif heading == "vertical":
+            if length not in self.verticalMasks:
+                self.verticalMasks[length] = sum(1 << (i * self.columns) for i in range(length))
+            return self.verticalMasks[length] << start
+        else:
+            raise ValueError
+
+    def isValidPlacement(self, position, length, heading):
+        #check edges
+        if not (0 <= position[0] < self.rows and 0 <= position[1] < self.columns):
+            return False
+        if heading == "vertical":
+            if length > self.rows - position[0]:
+                return False
+        elif heading == "horizontal":
+            if length > self.columns - position[1]:
+                return False
+        else:
+            raise ValueError
+
+        #check other ships
+        return self.placementMask(position, length, heading) & self.occupied == 0
+
+    def isValidShot(self, position):
+        if not (0 <= position[0] < self.rows and 0 <= position[1] < self.columns):
+            return False
+        return self.shots & self.cellBit(position) == 0
+
+    def placeLayout(self, layout):
+        for i, placement in enumerate(layout):
+            mask = self.placementMask(placement[0], self.shipLengths[i], placement[1])
+            self.occupied |= mask
+            self.shipMasks[i] = mask
+        self.layout = layout
+
+    def placeShip(self, position, length, heading, type):
+        if self.isValidPlacement(position, length, heading):
+            mask = self.placementMask(position, length, heading)
+            self.occupied |= mask
+            self.shipMasks[type-1] = mask
+
+    def markShot(self, position):
+        bit = self.cellBit(position)
+        self.shots |= bit
+        if self.occupied & bit == 0:
+            return None
+        self.hits |= bit
+        for i, shipMask in enumerate(self.shipMasks):
+            if shipMask & bit:
+                return i
+
+    def getValidShotMask(self):
+        return ~bitsToArray(self.shots, self.rows * self.columns)
+
+    def getOccupancy(self):
+        return bitsToArray(self.occupied, self.rows * self.columns).reshape(1, self.rows * self.columns)
+
+    # Dense views with the same values as PlayerBoard.grid and PlayerBoard.opponentView,
+    # built on demand for getGameState, the displays and anything else expecting arrays
+    @property
+    def grid(self):
+        size = self.rows * self.columns
+        grid = np.zeros([size,], dtype=int)
+        for i, shipMask in enumerate(self.shipMasks):
+            grid[bitsToArray(shipMask, size)] = i + 1
+        grid[bitsToArray(self.hits, size)] *= -1
+        grid[bitsToArray(self.shots & ~self.occupied, size)] = -(self.numShips+1) #+1 to avoid conflict with boat indices
+        return grid.reshape(self.rows, self.columns)
+
+    @property
+    def opponentView(self):
+        size = self.rows * self.columns
+        opponentView = np.zeros([size,], dtype=float)
+        opponentView[bitsToArray(self.shots, size)] = -1
+        opponentView[bitsToArray(self.hits, size)] = 1
+        return opponentView.reshape(self.rows, self.columns)
@@ -0,0 +1,108 @@
+import os
+import json
+import argparse
+import numpy as np
+
+from game import Game, gameSeed
+
+# Supervised datasets for pretraining the network in ai.py: every position of simulated
+# single player games, as the observation the network gets (getGameState: 1 hit, -1 miss,
+# 0 not shot yet) and the true ship occupancy of the board (getOccupancy) as the target.
+#
+# A dataset is a directory of shards, shardNNNNN_observations.npy (int8) and
+# shardNNNNN_occupancy.npy (uint8) with one row per position, plus index.json. Shards are
+# generated in parallel and read back with mmap_mode='r', so batches are read from disk
+# as they're needed instead of loading whole shards into memory.
+#
+#   $ python3 dataset.py --games 100000 --games-per-shard 1000 --workers 8 --seed 1 --path dataset
+
+def shardFiles(path, shardNum):
+    name = os.path.join(path, 'shard%05d' % shardNum)
+    return name + '_observations.npy', name + '_occupancy.npy'
+
+# Top level so it can be sent to a process pool
+def generateShard(args):
+    playerType, rows, columns, ships, boardBackend, seed, path, shardNum, numGames = args
+    observations = []
+    occupancy = []
+    game = None
+    for i in range(numGames):
+        thisSeed = gameSeed(seed, 'shard%s:%s' % (shardNum, i))
+        if game is None:
+            game = Game(1, [playerType], rows, columns, ships, False, seed=thisSeed, boardBackend=boardBackend)
+        else:
+            game.reset(thisSeed)
+        board = game.board
+        gameObservations = []
+        gameEnd = False
+        while not gameEnd:
+            gameObservations.append(board.getGameState().astype(np.int8))
+            gameEnd = board.executeTurn()
+        observations.append(np.concatenate(gameObservations, axis=0))
+        #the occupancy doesn't change during a game
+        occupancy.append(np.repeat(board.getOccupancy().astype(np.uint8), len(gameObservations), axis=0))
+    observations = np.concatenate(observations, axis=0)
+    occupancy = np.concatenate(occupancy, axis=0)
+    observationFile, occupancyFile = shardFiles(path, shardNum)
+    np.save(observationFile, observations)
+    np.save(occupancyFile, occupancy)
+    return len(observations)
+
+def buildDataset(path, numGames, gamesPerShard=1000, playerType='AI', rows=8, columns=8, ships=[2,3,3,4,5],
+                    workers=1, seed=None, boardBackend='dense'):
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    shards = [(playerType, rows, columns, ships, boardBackend, seed, path, shardNum, min(gamesPerShard, numGames - start))
+                for shardNum, start in enumerate(range(0, numGames, gamesPerShard))]
+    if workers == 1:
+        positions = [generateShard(shard) for shard in shards]
+    else:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            positions = pool.map(generateShard, shards)
+    index = {'rows': rows, 'columns': columns, 'ships': ships, 'playerType': playerType,
+                'shards': [{'shard': shardNum, 'positions': count} for shardNum, count in enumerate(positions)]}
+    with open(os.path.join(path, 'index.json'), 'w') as outfile:
+        json.dump(index, outfile, indent=2)
+    return sum(positions)
+
+def iterBatches(path, batchSize=32, epochs=1, shuffle=True, seed=None):
+    # Yields (observations, occupancy) float32 batches. Shards are visited in random order and
+    # shuffled within, only the rows of each batch are read from the memory mapped files.
+    with open(os.path.join(path, 'index.json')) as infile:
+        index = json.load(infile)
+    randomState = np.random.RandomState(seed)
+    for epoch in range(epochs):
+        shards = [shard['shard'] for shard in index['shards']]
+        if shuffle:
+            randomState.shuffle(shards)
+        for shardNum in shards:
+            observationFile, occupancyFile = shardFiles(path, shardNum)
+            observations = np.load(observationFile, mmap_mode='r')
+            occupancy = np.load(occupancyFile, mmap_mode='r')
+            order = randomState.permutation(len(observations)) if shuffle else np.arange(len(observations))
+            for start in range(0, len(order), batchSize):
+                rows = np.sort(order[start:start + batchSize]) #sorted reads are kinder to the page cache
+                yield observations[rows].astype(np.float32), occupancy[rows].astype(np.float32)
+
+def pretrain(model, path, batchSize=32, epochs=1, seed=None, logEvery=1000):
+    # Fits the model to predict ship occupancy from observations, before RL fine tuning in ai.py
+    losses = []
+    for batchNum, (observations, occupancy) in enumerate(iterBatches(path, batchSize, epochs, seed=seed)):
+        losses.append(model.train_on_batch(observations, occupancy))
+        if logEvery and batchNum % logEvery == 0:
+            print('Batch %s | Loss %.4f' % (batchNum, np.mean(losses[-logEvery:])))
+    return losses
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a supervised dataset of game positions.')
+    parser.add_argument('--games', type=int, default=10000, help='')
+    parser.add_argument('--games-per-shard', type=int, default=1000, help='')
+    parser.add_argument('--player', type=str, default='AI', help='player type whose games are recorded')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes generating shards')
+    parser.add_argument('--seed', type=int, default=None, help='seed for a reproducible dataset')
+    parser.add_argument('--path', type=str, default='dataset', help='dataset directory')
+    args = parser.parse_args()
+
+    numPositions = buildDataset(args.path, args.games, args.games_per_shard, args.player, workers=args.workers, seed=args.seed)
+    print('%s positions written to %s' % (numPositions, args.path))
@@ -0,0 +1,106 @@
+import sys
+from time import perf_counter
+
+# Game events published by Game/Board/PlayerBoard. Callback arguments:
+#   turnStart(board), turnEnd(board)
+#   shotFired(board, position), hit(board, position), miss(board, position)
+#   shipSunk(board, shipIndex)
+#   gameOver(board, gameReport)
+#   batchProgress(gameNum, numGames), every 10 games of a GameBatch chunk
+EVENTS = ['turnStart', 'shotFired', 'hit', 'miss', 'shipSunk', 'turnEnd', 'gameOver', 'batchProgress']
+
+class EventBus:
+    def __init__(self):
+        #only events with at least one subscriber have an entry, emitting anything else is a single dict lookup
+        self.subscribers = {}
+        self.instrumentation = None #see instrumentation.py, subscriber time is added to the 'events' phase
+
+    def __bool__(self):
+        return bool(self.subscribers)
+
+    def subscribe(self, event, callback):
+        if event not in EVENTS:
+            raise ValueError
+        self.subscribers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event, callback):
+        callbacks = self.subscribers.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self.subscribers.pop(event, None)
+
+    def emit(self, event, *args):
+        callbacks = self.subscribers.get(event)
+        if callbacks:
+            if self.instrumentation is None:
+                for callback in callbacks:
+                    callback(*args)
+            else:
+                start = perf_counter()
+                for callback in callbacks:
+                    callback(*args)
+                self.instrumentation.addTime('events', perf_counter() - start)
+
+
+class ConsoleDisplay:
+    # Text display of the game, what showDisplay=True used to print directly
+    def __init__(self, stream=None):
+        self.stream = stream #None follows sys.stdout
+
+    def attach(self, events):
+        for event in EVENTS:
+            events.subscribe(event, getattr(self, event))
+        return self
+
+    def detach(self, events):
+        for event in EVENTS:
+            events.unsubscribe(event, getattr(self, event))
+
+    def write(self, *args, **kwargs):
+        print(*args, file=self.stream or sys.stdout, **kwargs)
+
+    def printState(self, board):
+        self.write("Ship State: %s" % board.shipsSunk)
+        self.write('Board score: %s' % board.getScore())
+        board.printView(file=self.stream)
+        self.write('\n')
+
+    def turnStart(self, board):
+        self.write('\nPlayer %s Turn:' % board.player.number)
+        self.write("#"*20)
+        self.write('\nBefore:')
+        self.printState(board)
+
+    def shotFired(self, board, position):
+        self.write('Firing at %s' % position)
+
+    def hit(self, board, position):
+        self.write('Hit!')
+
+    def miss(self, board, position):
+        self.write('Miss!')
+
+    def shipSunk(self, board, shipIndex):
+        self.write('Ship of length ' + str(board.shipLengths[shipIndex]) + ' sunk!')
+
+    def turnEnd(self, board):
+        self.write('\nAfter:')
+        self.printState(board)
+
+    def gameOver(self, board, gameReport):
+        self.write('*'*50)
+        self.write('Player %s wins in %s moves!' % (gameReport['winnerPlayerNum'], gameReport['winnerNumMoves']))
+        self.write('*'*50)
+
+    def batchProgress(self, gameNum, numGames):
+        self.write('Game %s of %s' % (gameNum, numGames))
+
+
+class FileLogger(ConsoleDisplay):
+    # Same output as the console display, written to a file instead
+    def __init__(self, path='logFile'):
+        ConsoleDisplay.__init__(self, open(path, 'w'))
+
+    def close(self):
+        self.stream.close()
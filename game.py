@@ -1,27 +1,91 @@
-import sys
 import os
 import logging
 import argparse
+import random
 import numpy as np
-from random import randint
-from time import sleep
-import matplotlib.pyplot as plt
+from time import sleep, perf_counter
 import statistics
 
 
-from ruleBasedAI import RuleAI
-
-# Disable
-def disablePrint():
-    sys.stdout = open('logFile', 'w')
-    # sys.stdout = open(os.devnull, 'w')
-
-# Enable
-def enablePrint():
-    sys.stdout = sys.__stdout__
+from ruleBasedAI import RuleAI, readAIConfig
+from probabilityAI import ProbabilityAI
+from sparseAI import SparseAI
+from neuralAI import NeuralAI
+from events import EventBus, ConsoleDisplay
+from placement import PlacementIndex
+from batchStats import BatchStats
+from instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Event bus for a new game, with the console display subscribed if the game is shown
+def makeEvents(showDisplay):
+    events = EventBus()
+    if showDisplay:
+        ConsoleDisplay().attach(events)
+    return events
+
+# PlayerBoard implementation used for each board of a game
+def getBoardClass(boardBackend):
+    if boardBackend == 'dense':
+        return PlayerBoard
+    elif boardBackend == 'bitboard':
+        from bitBoard import BitPlayerBoard
+        return BitPlayerBoard
+    elif boardBackend == 'sparse':
+        from sparseBoard import SparsePlayerBoard
+        return SparsePlayerBoard
+    else:
+        raise ValueError
+
+# Independent random stream for one consumer (a board, a player...) of a seeded game.
+# Without a seed everything shares the global random module state, like before.
+def seededRandom(seed, *stream):
+    if seed is None:
+        return random
+    return random.Random(':'.join(str(part) for part in (seed,) + stream))
+
+# Seeds are derived per game (not per worker) so results don't depend on how games are split up
+def gameSeed(seed, gameNum):
+    return None if seed is None else '%s:%s' % (seed, gameNum)
+
+# Top level so it can be sent to a process pool
+def playGameChunk(args):
+    numPlayers, playerTypes, rows, columns, ships, showDisplay, backend, boardBackend, pooled, instrument, record, seed, start, stop, numGames = args
+    if backend == 'vectorized':
+        from vectorizedGame import BatchedGame
+        batchedGame = BatchedGame(numPlayers, playerTypes, stop - start, rows, columns, ships,
+                                    seed=gameSeed(seed, 'chunk%s' % start))
+        return batchedGame.playGames()
+
+    gameReports = []
+    thisGame = None
+    progress = EventBus()
+    progress.subscribe('batchProgress', ConsoleDisplay().batchProgress)
+    for i in range(start, stop):
+        if pooled and thisGame is not None:
+            #same game as a fresh Game with this seed, without reallocating anything
+            thisGame.reset(gameSeed(seed, i))
+        else:
+            thisGame = Game(numPlayers, playerTypes, rows, columns, ships, showDisplay, seed=gameSeed(seed, i), boardBackend=boardBackend,
+                            instrumentation=Instrumentation() if instrument else None, record=record)
+        gameReports.append(thisGame.playGame())
+        if i % 10 == 0:
+            progress.emit('batchProgress', i, numGames)
+    return gameReports
 
 class GameBatch:
-    def __init__(self, numPlayers, playerTypes, numGames, rows, columns, ships, showDisplay):
+    BACKENDS = ['serial', 'vectorized']
+
+    def __init__(self, numPlayers, playerTypes, numGames, rows, columns, ships, showDisplay, backend='serial',
+                    workers=1, seed=None, chunkSize=100, boardBackend='dense', pooled=False, instrument=False,
+                    record=False):
+        if backend not in GameBatch.BACKENDS or workers < 1 or chunkSize < 1:
+            raise ValueError
+        if instrument and backend != 'serial':
+            raise ValueError('instrumentation is only available for the serial backend')
+        if record and backend != 'serial':
+            raise ValueError('game records are only available for the serial backend')
         self.numGames = numGames
         self.rows = rows
         self.columns = columns
@@ -29,17 +93,58 @@ class GameBatch:
         self.showDisplay = showDisplay
         self.numPlayers = numPlayers
         self.playerTypes = playerTypes
+        self.backend = backend
+        self.boardBackend = boardBackend
+        self.pooled = pooled
+        self.instrument = instrument #adds gameReport['instrumentation'], totalled by runGames in BatchStats.instrumentation
+        self.record = record #adds gameReport['record'], see gameRecord.GameRecordWriter
+        self.workers = workers
+        self.seed = seed
+        self.chunkSize = chunkSize
         return
 
+    def iterGames(self):
+        # Yields each gameReport in game order as soon as its chunk is done. Chunk boundaries
+        # only depend on chunkSize, so a seeded batch gives the same reports for any worker count.
+        chunks = [(self.numPlayers, self.playerTypes, self.rows, self.columns, self.ships, self.showDisplay,
+                    self.backend, self.boardBackend, self.pooled, self.instrument, self.record, self.seed, start, min(start + self.chunkSize, self.numGames), self.numGames)
+                    for start in range(0, self.numGames, self.chunkSize)]
+        if self.workers == 1:
+            for chunk in chunks:
+                for gameReport in playGameChunk(chunk):
+                    yield gameReport
+        else:
+            from multiprocessing import Pool
+            with Pool(self.workers) as pool:
+                for reports in pool.imap(playGameChunk, chunks): #imap keeps the results in game order
+                    for gameReport in reports:
+                        yield gameReport
+
+    def getGameReports(self):
+        return list(self.iterGames())
+
+    def runGames(self, sinks=(), meanMovesHalfWidth=None, winRateHalfWidth=None, minGames=30, z=1.96):
+        # Plays up to numGames games, writing each report to the sinks and keeping only
+        # running statistics. Stops early once the mean moves and/or player 1 win rate
+        # confidence intervals are narrower than the given half widths.
+        stats = BatchStats(self.playerTypes[:self.numPlayers])
+        games = self.iterGames()
+        for gameReport in games:
+            stats.add(gameReport)
+            for sink in sinks:
+                sink.write(gameReport)
+            if stats.isConfident(meanMovesHalfWidth, winRateHalfWidth, minGames, z):
+                games.close() #stops the workers too
+                break
+        return stats
+
     def playGames(self):
+        import matplotlib.pyplot as plt #only needed for the plot, keeps headless imports light
+
         winner = []
         numMoves = []
-        for i in range(self.numGames):
-            thisGame = Game(self.numPlayers, self.playerTypes, self.rows, self.columns, self.ships, self.showDisplay)
-            gameReport = thisGame.playGame()
+        for gameReport in self.getGameReports():
             # print(gameReport)
-            if i % 10 == 0:
-                print('Game %s of %s' % (i, self.numGames))
             winner.append(gameReport['winnerPlayerNum'])
             numMoves.append(gameReport['winnerNumMoves'])
 
@@ -62,28 +167,59 @@ class GameBatch:
 
 
 class Game:
-    def __init__(self, numPlayers, playerTypes, rows, columns, ships, showDisplay):
+    def __init__(self, numPlayers, playerTypes, rows, columns, ships, showDisplay, seed=None, events=None, boardBackend='dense',
+                    instrumentation=None, record=False):
         self.numPlayers = numPlayers
         self.playerTypes = playerTypes
         self.ships = ships
         self.rows = rows
         self.columns = columns
         self.showDisplay = showDisplay
+        self.seed = seed
+        self.boardBackend = boardBackend
+        self.events = events if events is not None else makeEvents(showDisplay)
+        # Timings and counters for each game are added to its gameReport (see instrumentation.py)
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            self.events.instrumentation = instrumentation
         if numPlayers == 1:
-            trainingPlayer = Player(1, playerTypes[0], rows, columns)
-            self.board = PlayerBoard(rows, columns, trainingPlayer, ships, showDisplay)
+            trainingPlayer = Player(1, playerTypes[0], rows, columns, seededRandom(seed, 'player', 1), ships, instrumentation)
+            BoardClass = getBoardClass(boardBackend)
+            self.board = BoardClass(rows, columns, trainingPlayer, ships, showDisplay, seededRandom(seed, 'board', 1), self.events, instrumentation)
         elif numPlayers == 2:
             # 2 players (head to head):
-            self.board = Board(rows, columns, playerTypes[0], playerTypes[1], ships, showDisplay)
+            self.board = Board(rows, columns, playerTypes[0], playerTypes[1], ships, showDisplay, seed, self.events, boardBackend, instrumentation)
         else:
             raise ValueError
+        # The layouts and shots of each game are added to its gameReport as a binary record (see gameRecord.py)
+        self.record = record
+        if record:
+            from gameRecord import checkRecordable
+            checkRecordable(rows, columns, ships, numPlayers)
+            for playerBoard in self.getPlayerBoards():
+                playerBoard.startRecording()
+
+    def subscribe(self, event, callback):
+        self.events.subscribe(event, callback)
 
     def playGame(self):
+        if self.instrumentation is not None:
+            start = perf_counter()
         gameEnd = False
         while not gameEnd:
             gameEnd = self.board.executeTurn()
             # sleep(0.01)
-        return self.board.getGameReport()
+        gameReport = self.board.getGameReport()
+        if self.record:
+            from gameRecord import encodeGame
+            gameReport['record'] = encodeGame(self.getPlayerBoards(), gameReport['winnerPlayerNum'])
+        if self.instrumentation is not None:
+            #the totals start over for the next game (placement for the next game is counted in it)
+            self.instrumentation.addTime('game', perf_counter() - start)
+            self.instrumentation.games += 1
+            gameReport['instrumentation'] = self.instrumentation.summary()
+            self.instrumentation.clear()
+        return gameReport
 
     #these methods assume single player board
     #modeled after https://gist.github.com/EderSantana/c7222daa328f0e885093
@@ -93,7 +229,8 @@ class Game:
         self.board.shoot(position)
 
     def observe(self):
-        self.board.printView()
+        if self.showDisplay:
+            self.board.printView()
         return self.board.getGameState()
 
     def act(self, action):
@@ -102,16 +239,32 @@ class Game:
         gameOver = self.board.isGameOver()
         return self.observe(), reward, gameOver
 
-    def reset(self):
-        self.__init__(self.numPlayers, self.playerTypes, self.rows, self.columns, self.ships, self.showDisplay)
+    def getPlayerBoards(self):
+        if self.numPlayers == 1:
+            return [self.board]
+        return [self.board.board1, self.board.board2]
+
+    def reset(self, seed=None):
+        # Starts a new game reusing the boards, players and AIs. A seeded game keeps drawing
+        # from its random streams unless a new seed is given, which makes the next game the
+        # same as a new Game created with that seed.
+        if seed is not None:
+            self.seed = seed
+            for number, playerBoard in enumerate(self.getPlayerBoards(), 1):
+                playerBoard.rng = seededRandom(seed, 'board', number)
+                playerBoard.player.setRng(seededRandom(seed, 'player', number))
+        self.board.reset()
 
 
 class Board:
-    def __init__(self, rows, columns, player1Type, player2Type, ships, showDisplay):
-        self.player1 = Player(1, player1Type, rows, columns)
-        self.player2 = Player(2, player2Type, rows, columns)
-        self.board1 = PlayerBoard(rows, columns, self.player1, ships, showDisplay)
-        self.board2 = PlayerBoard(rows, columns, self.player2, ships, showDisplay)
+    def __init__(self, rows, columns, player1Type, player2Type, ships, showDisplay, seed=None, events=None, boardBackend='dense',
+                    instrumentation=None):
+        self.events = events if events is not None else makeEvents(showDisplay)
+        BoardClass = getBoardClass(boardBackend)
+        self.player1 = Player(1, player1Type, rows, columns, seededRandom(seed, 'player', 1), ships, instrumentation)
+        self.player2 = Player(2, player2Type, rows, columns, seededRandom(seed, 'player', 2), ships, instrumentation)
+        self.board1 = BoardClass(rows, columns, self.player1, ships, showDisplay, seededRandom(seed, 'board', 1), self.events, instrumentation)
+        self.board2 = BoardClass(rows, columns, self.player2, ships, showDisplay, seededRandom(seed, 'board', 2), self.events, instrumentation)
         self.currentPlayer = self.player1
         self.currentBoard = self.board1
 
@@ -123,6 +276,15 @@ class Board:
         self.currentBoard = self.board1 if self.currentBoard.player.number == 2 else self.board2
         return gameEnd
 
+    def subscribe(self, event, callback):
+        self.events.subscribe(event, callback)
+
+    def reset(self):
+        self.board1.reset()
+        self.board2.reset()
+        self.currentPlayer = self.player1
+        self.currentBoard = self.board1
+
     def getGameReport(self):
         return self.winningBoard.gameReport
 
@@ -144,38 +306,49 @@ class Board:
         print("Ship State:", self.board2.shipsSunk)
         print('\n')
 
+# The game rules (lives, ship counts, rewards, events) live here, the cells are stored by
+# the backend. This class is the dense one, the others (see getBoardClass) override the
+# storage methods: initCells, clearCells, markShot, isValidShot and the placement methods.
 class PlayerBoard:
     MISS_VALUE = -1
     HIT_VALUE = 10
     REPEAT_VALUE = -2
     DISPLAY_MAPPING= {-1:'O', 0:' ', 1:'X'}
 
-    def __init__(self, rows, columns, player, ships, showDisplay):
-        if not showDisplay:
-            disablePrint()
+    def __init__(self, rows, columns, player, ships, showDisplay, rng=random, events=None, instrumentation=None, layout=None):
+        self.rng = rng
+        self.instrumentation = instrumentation
+        self.shotLog = None #flat indices of the shots taken, only kept while recording (see gameRecord.py)
+        self.events = events if events is not None else makeEvents(showDisplay)
         self.lifeCount = sum(ships)
         self.numShips = len(ships)
+        self.shipLengths = list(ships)
         self.ships = np.array(ships[:], dtype=int) #used to keep track of when a particular boat is sunk
         self.shipsSunk = np.zeros([len(self.ships),], dtype=int)
         self.rows = rows
         self.columns = columns
-        self.grid = np.zeros([rows,columns], dtype=int)
-        self.randomBoatPlacement()
-        self.opponentView = np.zeros([rows,columns],dtype=float)
+        self.initCells()
+        self.placeFleet(layout)
         self.player = player
         self.reward = 0
         self.score = 0
         self.moves = 0
+        self.sunkShip = None #index of the ship sunk by the last shot, if any
+
+    def initCells(self):
+        self.grid = np.zeros([self.rows,self.columns], dtype=int)
+        self.opponentView = np.zeros([self.rows,self.columns],dtype=float)
+
+    def clearCells(self):
+        self.grid.fill(0)
+        self.opponentView.fill(0)
 
     def isGameOver(self):
         if self.lifeCount == 0:
-            enablePrint()
             currentPlayerNum = self.player.number
             self.gameReport = {'winnerPlayerNum': currentPlayerNum,
                                 'winnerNumMoves': self.moves}
-            # print('*'*50)
-            # print('Player %s Wins by clearing Board %d in %s moves!' % (currentPlayerNum, 1 if currentPlayerNum == 2 else 2, self.moves)) #(which player num is shooting at which board?)
-            # print('*'*50)
+            self.events.emit('gameOver', self, self.gameReport)
             return True
         else:
             return False
@@ -183,33 +356,62 @@ class PlayerBoard:
     def getGameReport(self):
         return self.gameReport
 
+    def subscribe(self, event, callback):
+        self.events.subscribe(event, callback)
+
+    def reset(self):
+        #clears the board in place and places a new fleet, the player's AI starts over too
+        self.lifeCount = sum(self.shipLengths)
+        self.ships[:] = self.shipLengths
+        self.shipsSunk.fill(0)
+        self.clearCells()
+        self.placeFleet()
+        self.player.reset()
+        self.reward = 0
+        self.score = 0
+        self.moves = 0
+        self.sunkShip = None
+        if self.shotLog is not None:
+            self.shotLog = []
+
     def executeTurn(self):
-        print('\nPlayer %s Turn:' % self.player.number)
-        print("#"*20)
-        print('\nBefore:')
-        print("Ship State: %s" % self.shipsSunk)
-        print('Board score: %s' % self.getScore())
-        self.printView()
-        print('\n')
+        self.events.emit('turnStart', self)
+
+        instrumentation = self.instrumentation
 
         # # Repeat shots allowed to retry
         validShot = False
-        while not validShot:
-            shotPosition = self.player.getShot()
-            validShot = self.isValidShot(shotPosition)
+        if instrumentation is None:
+            while not validShot:
+                shotPosition = self.player.getShot()
+                validShot = self.isValidShot(shotPosition)
+        else:
+            retries = -1
+            while not validShot:
+                start = perf_counter()
+                shotPosition = self.player.getShot()
+                shotTime = perf_counter()
+                validShot = self.isValidShot(shotPosition)
+                instrumentation.addTime('getShot', shotTime - start)
+                instrumentation.addTime('isValidShot', perf_counter() - shotTime)
+                retries += 1
+            instrumentation.count('invalidShots', retries)
 
         # # Alternatively a bad shot could just be a skipped turn
         # shotPosition = self.player.getShot()
 
 
-        print('Firing at %s' % shotPosition)
-        isHit = self.shoot(shotPosition)
-        self.player.postExecution(shotPosition, isHit)
-        print('\nAfter:')
-        print("Ship State: %s" % self.shipsSunk)
-        print('Board score: %s' % self.getScore())
-        self.printView()
-        print('\n')
+        if instrumentation is None:
+            isHit = self.shoot(shotPosition)
+            self.player.postExecution(shotPosition, isHit, self.sunkShip)
+        else:
+            start = perf_counter()
+            isHit = self.shoot(shotPosition)
+            shootTime = perf_counter()
+            self.player.postExecution(shotPosition, isHit, self.sunkShip)
+            instrumentation.addTime('shoot', shootTime - start)
+            instrumentation.addTime('postExecution', perf_counter() - shootTime)
+        self.events.emit('turnEnd', self)
         return self.isGameOver()
 
 
@@ -220,6 +422,15 @@ class PlayerBoard:
         # gameState = self.opponentView
         return gameState
 
+    def getValidShotMask(self):
+        #flat mask of the cells that haven't been shot at, in getGameState order
+        return (self.grid >= 0).ravel()
+
+    def getOccupancy(self):
+        #True where there is a ship (hit or not), shaped like getGameState
+        grid = self.grid
+        return ((grid != 0) & (grid >= -self.numShips)).reshape(1, self.rows*self.columns)
+
     def getScore(self):
         return self.score
 
@@ -227,17 +438,17 @@ class PlayerBoard:
     def isValidPlacement(self, position, length, heading):
         #check edges
         if position[0] not in range(self.rows) or position[1] not in range(self.columns):
-            print('start position out of bounds')
+            logger.debug('start position out of bounds')
             return False
         if heading == "vertical":
             remainingRows = self.rows - position[0]
             if length > remainingRows:
-                print('end position out of bounds')
+                logger.debug('end position out of bounds')
                 return False
         elif heading == "horizontal":
             remainingColumns = self.columns - position[1]
             if length > remainingColumns:
-                print('end position out of bounds')
+                logger.debug('end position out of bounds')
                 return False
         else:
             raise ValueError
@@ -246,12 +457,12 @@ class PlayerBoard:
         if heading == "vertical":
             for i in range(length):
                 if self.grid[position[0] + i, position[1]] != 0:
-                    print('another boat is there')
+                    logger.debug('another boat is there')
                     return False
         elif heading == "horizontal":
             for j in range(length):
                 if self.grid[position[0], position[1] + j] != 0:
-                    print('another boat is there')
+                    logger.debug('another boat is there')
                     return False
         else:
             raise ValueError
@@ -278,81 +489,123 @@ class PlayerBoard:
                 for j in range(length):
                     self.grid[startRow, startCol + j] = type
         else:
-            print('invalid placement, try again')
+            logger.debug('invalid placement, try again')
 
-    def printBoard(self):
+    def printBoard(self, file=None):
         for row in self.grid:
-            print(row)
+            print(row, file=file)
 
-    def printView(self):
-        print('-'*32)
+    def printView(self, file=None):
+        print('-'*32, file=file)
         for row in self.opponentView:
-            print('|', end='')
+            print('|', end='', file=file)
             for col in row:
-                print(' %1s |' % PlayerBoard.DISPLAY_MAPPING[col], end='')
-            print('\n'+'-'*32)
+                print(' %1s |' % PlayerBoard.DISPLAY_MAPPING[col], end='', file=file)
+            print('\n'+'-'*32, file=file)
+
+    def placeFleet(self, layout=None):
+        #a random fleet, or the given layout
+        if self.instrumentation is not None:
+            start = perf_counter()
+        if layout is None:
+            self.randomBoatPlacement()
+        else:
+            self.placeLayout(layout)
+        if self.instrumentation is not None:
+            self.instrumentation.addTime('placement', perf_counter() - start)
 
     def randomBoatPlacement(self):
-        for i, ship in enumerate(self.ships):
-            length = ship
-            type = i + 1
-            validPlacement = False
-            while not validPlacement:
-                heading = "vertical" if randint(0,1) == 0 else "horizontal"
-                position = [randint(0,self.rows-1),randint(0,self.columns-1)]
-                validPlacement = self.isValidPlacement(position, ship, heading)
-            self.placeShip(position, length, heading, type)
+        self.placeLayout(PlacementIndex.get(self.rows, self.columns).sampleFleet(self.shipLengths, self.rng))
+
+    def placeLayout(self, layout):
+        #layout has a (position, heading, ...) per ship, in shipLengths order
+        for i, placement in enumerate(layout):
+            self.placeShip(placement[0], self.shipLengths[i], placement[1], i + 1)
+        self.layout = layout
+
+    def startRecording(self):
+        self.shotLog = []
 
     def shoot(self, position):
+        self.sunkShip = None
         if self.isValidShot(position):
+            self.events.emit('shotFired', self, position)
             self.moves += 1
-            val = self.grid[position[0],position[1]]
-            if val == 0:
-                print('Miss!')
-                self.grid[position[0],position[1]] = -(self.numShips+1) #+1 to avoid conflict with boat indices
-                self.opponentView[position[0],position[1]] = -1
+            if self.shotLog is not None:
+                self.shotLog.append(position[0] * self.columns + position[1])
+            shipIndex = self.markShot(position)
+            if shipIndex is None:
+                self.events.emit('miss', self, position)
                 self.reward = PlayerBoard.MISS_VALUE
                 return False
             else:
-                print('Hit!')
-                self.grid[position[0],position[1]] *= -1
-                self.opponentView[position[0],position[1]] = 1
+                self.events.emit('hit', self, position)
                 self.reward = PlayerBoard.HIT_VALUE
                 self.score += self.reward
                 self.lifeCount -= 1
-                self.ships[val-1] -= 1
-                if self.ships[val-1] == 0:
-                    self.shipsSunk[val-1]=1 #would use True, but using in the gameState variable with ints
-                    print('Ship of length ' + str(val) + ' sunk!')
+                self.ships[shipIndex] -= 1
+                if self.ships[shipIndex] == 0:
+                    self.shipsSunk[shipIndex]=1 #would use True, but using in the gameState variable with ints
+                    self.sunkShip = shipIndex
+                    self.events.emit('shipSunk', self, shipIndex)
                 return True
         else:
             self.reward = PlayerBoard.REPEAT_VALUE
             self.score += self.reward
             return False
 
+    def markShot(self, position):
+        #records a valid shot in the cells, returns the index of the ship hit or None for a miss
+        val = self.grid[position[0],position[1]]
+        if val == 0:
+            self.grid[position[0],position[1]] = -(self.numShips+1) #+1 to avoid conflict with boat indices
+            self.opponentView[position[0],position[1]] = -1
+            return None
+        self.grid[position[0],position[1]] *= -1
+        self.opponentView[position[0],position[1]] = 1
+        return int(val)-1
+
 class Player:
-    def __init__(self, number, playerType, rows, columns):
+    def __init__(self, number, playerType, rows, columns, rng=random, ships=None, instrumentation=None):
         self.playerType = playerType
         self.number = number
         self.rows = rows
         self.columns = columns
         if playerType != 'Human':
-            self.ai = RuleAI(rows, columns, playerType)
+            #the config.ini section for the player type picks the AI
+            strategy = readAIConfig(playerType)['strategy']
+            if strategy == 'rule':
+                self.ai = RuleAI(rows, columns, playerType, rng, instrumentation, ships)
+            elif strategy == 'probability':
+                self.ai = ProbabilityAI(rows, columns, playerType, rng, ships)
+            elif strategy == 'sparse':
+                self.ai = SparseAI(rows, columns, playerType, rng, ships)
+            elif strategy == 'neural':
+                self.ai = NeuralAI(rows, columns, playerType, rng)
+            else:
+                raise ValueError('unknown strategy %s' % strategy)
+
+    def reset(self):
+        if self.playerType != 'Human':
+            self.ai.reset()
+
+    def setRng(self, rng):
+        if self.playerType != 'Human':
+            self.ai.rng = rng
 
     def getShot(self):
-        if self.playerType in ['AI', 'RANDOM']:
+        if self.playerType != 'Human':
             return self.ai.getNextMove()
         elif self.playerType == 'Human':
             positionString = input('Player ' + str(self.number) + ' Fire at will (row <space> col, zero indexed) \n')
             #TODO: Add error handling for inputs
             positionList = list(map(int, positionString.split()))
             return positionList
-        else:
-            raise ValueError
 
-    def postExecution(self, prevMove, isHit):
-        if self.playerType == 'AI':
-            self.ai.postExecution(prevMove, isHit)
+    def postExecution(self, prevMove, isHit, sunkShip=None):
+        #RANDOM included, so its random moves are drawn from the cells it hasn't played
+        if self.playerType != 'Human':
+            self.ai.postExecution(prevMove, isHit, sunkShip)
         else:
             pass
 
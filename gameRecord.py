@@ -0,0 +1,154 @@
+import mmap
+import struct
+import numpy as np
+
+from game import Player, getBoardClass
+
+# Compact binary records of finished games, enough to rebuild every board at any turn
+# without running the AIs again.
+#
+# A record file starts with MAGIC (whose last byte is the format version), followed by
+# records of:
+#   header      RECORD_HEADER: record length in bytes, rows, columns, number of boards,
+#               number of ships, winning player number (0 if the game didn't finish)
+#   ships       SHIP_LENGTH per ship
+#   per board   the layout, PLACEMENT (flat start cell, heading) per ship, then the number of
+#               shots (SHOT_COUNT) and the flat cell index of each shot, one byte each on boards
+#               of up to 256 cells, two bytes on boards of up to 65536 cells and four otherwise
+# Board n is shot at on turns n-1, n-1+numBoards, ... (player 1 always moves first).
+
+VERSION = 1
+MAGIC = b'BSGR' + bytes([VERSION])
+RECORD_HEADER = struct.Struct('<IHHBHB')
+SHIP_LENGTH = np.dtype('<u2')
+PLACEMENT = struct.Struct('<IB')
+SHOT_COUNT = struct.Struct('<I')
+MAX_DIMENSION = 65535
+HEADINGS = ['vertical', 'horizontal']
+
+def shotDtype(rows, columns):
+    if rows * columns <= 256:
+        return np.dtype(np.uint8)
+    return np.dtype('<u2') if rows * columns <= 65536 else np.dtype('<u4')
+
+def checkRecordable(rows, columns, ships, numBoards=2):
+    #before a game is played, rather than when it's encoded
+    if rows > MAX_DIMENSION or columns > MAX_DIMENSION or len(ships) > 65535 or numBoards > 255:
+        raise ValueError('a %sx%s game with %s ships can\'t be recorded' % (rows, columns, len(ships)))
+
+def encodeGame(playerBoards, winnerPlayerNum=0):
+    # Record of a game whose boards were recording (PlayerBoard.startRecording)
+    rows = playerBoards[0].rows
+    columns = playerBoards[0].columns
+    ships = playerBoards[0].shipLengths
+    dtype = shotDtype(rows, columns)
+    body = [np.asarray(ships, dtype=SHIP_LENGTH).tobytes()]
+    for playerBoard in playerBoards:
+        for placement in playerBoard.layout:
+            body.append(PLACEMENT.pack(placement[0][0] * columns + placement[0][1], HEADINGS.index(placement[1])))
+        body.append(SHOT_COUNT.pack(len(playerBoard.shotLog)))
+        body.append(np.asarray(playerBoard.shotLog, dtype=dtype).tobytes())
+    body = b''.join(body)
+    return RECORD_HEADER.pack(RECORD_HEADER.size + len(body), rows, columns, len(playerBoards), len(ships), winnerPlayerNum) + body
+
+
+class GameRecord:
+    def __init__(self, buffer, offset=0):
+        length, self.rows, self.columns, numBoards, numShips, self.winnerPlayerNum = RECORD_HEADER.unpack_from(buffer, offset)
+        offset += RECORD_HEADER.size
+        self.ships = [int(length) for length in np.frombuffer(buffer, dtype=SHIP_LENGTH, count=numShips, offset=offset)]
+        offset += numShips * SHIP_LENGTH.itemsize
+        dtype = shotDtype(self.rows, self.columns)
+        self.layouts = []
+        self.shots = [] #per board, array of flat cell indices (a view of the buffer, nothing is copied)
+        for board in range(numBoards):
+            layout = []
+            for ship in range(numShips):
+                cell, heading = PLACEMENT.unpack_from(buffer, offset)
+                layout.append(((cell // self.columns, cell % self.columns), HEADINGS[heading]))
+                offset += PLACEMENT.size
+            self.layouts.append(layout)
+            numShots, = SHOT_COUNT.unpack_from(buffer, offset)
+            offset += SHOT_COUNT.size
+            self.shots.append(np.frombuffer(buffer, dtype=dtype, count=numShots, offset=offset))
+            offset += numShots * dtype.itemsize
+
+    @property
+    def numBoards(self):
+        return len(self.layouts)
+
+    @property
+    def numTurns(self):
+        return sum(len(shots) for shots in self.shots)
+
+    def shotsAt(self, turn, boardIdx):
+        #shots taken at board boardIdx in the first `turn` turns
+        return self.shots[boardIdx][:max(turn + self.numBoards - 1 - boardIdx, 0) // self.numBoards]
+
+    def replay(self, turn=None, boardBackend='dense'):
+        # PlayerBoards as they were after `turn` turns (the end of the game by default). The
+        # players are Human so no AI is created, and nothing is displayed.
+        if turn is None:
+            turn = self.numTurns
+        BoardClass = getBoardClass(boardBackend)
+        playerBoards = []
+        for boardIdx, layout in enumerate(self.layouts):
+            player = Player(boardIdx + 1, 'Human', self.rows, self.columns)
+            playerBoard = BoardClass(self.rows, self.columns, player, self.ships, False, layout=layout)
+            for cell in self.shotsAt(turn, boardIdx):
+                playerBoard.shoot([int(cell) // self.columns, int(cell) % self.columns])
+            playerBoards.append(playerBoard)
+        return playerBoards
+
+
+class GameRecordReader:
+    # Memory maps a record file, records are decoded when they're accessed
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError('%s is not a version %s game record file' % (path, VERSION))
+        self.offsets = self.indexRecords()
+
+    def indexRecords(self):
+        offsets = []
+        offset = len(MAGIC)
+        lengthField = struct.Struct('<I')
+        while offset < len(self.buffer):
+            offsets.append(offset)
+            offset += lengthField.unpack_from(self.buffer, offset)[0]
+        return np.array(offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        return GameRecord(self.buffer, int(self.offsets[i]))
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield GameRecord(self.buffer, int(offset))
+
+    def close(self):
+        #records already read keep views of the buffer, drop them first
+        self.buffer.close()
+        self.file.close()
+
+
+class GameRecordWriter:
+    # Appends records, also works as a GameBatch.runGames sink for batches played with record=True
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        else:
+            with open(path, 'rb') as existing:
+                if existing.read(len(MAGIC)) != MAGIC:
+                    self.file.close()
+                    raise ValueError('%s is not a version %s game record file' % (path, VERSION))
+
+    def write(self, gameReport):
+        self.file.write(gameReport['record'])
+
+    def close(self):
+        self.file.close()
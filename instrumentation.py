@@ -0,0 +1,95 @@
+import json
+
+# Optional per phase timings and counters for Game/Board/PlayerBoard/RuleAI.
+# Everything instrumented holds an `instrumentation` attribute that is None unless
+# one of these is passed in, and only times itself (with time.perf_counter) when it isn't.
+#
+# Phases timed:
+#   placement      PlayerBoard fleet placement (new board or reset)
+#   getShot        Player.getShot, the AI decision
+#   isValidShot    validity check of each shot the player proposes
+#   shoot          PlayerBoard.shoot
+#   postExecution  Player.postExecution, the AI update after a shot
+#   events         event bus subscribers (the text display and any other callbacks),
+#                  this time is also part of the phase that emitted the event
+#   game           Game.playGame
+# Counters:
+#   invalidShots            repeat or off board shots retried in PlayerBoard.executeTurn
+#   scoreMapBuilds          full RuleAI score map evaluations
+# (randomMoveRejections, the random RuleAI moves redrawn because the cell had been played,
+# is gone: RuleAI draws from UnplayedCells since, which never picks a played cell.)
+# Gauges (count/total/max of sampled values):
+#   queueLength             RuleAI move queue length at each decision
+
+class Instrumentation:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+        self.gauges = {}
+        self.games = 0
+
+    def addTime(self, phase, seconds):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        if name not in self.gauges:
+            self.gauges[name] = {'count': 0, 'total': 0, 'max': value}
+        gauge = self.gauges[name]
+        gauge['count'] += 1
+        gauge['total'] += value
+        gauge['max'] = max(gauge['max'], value)
+
+    def summary(self):
+        #plain dict, JSON serializable and accepted by merge()
+        return {'games': self.games,
+                'times': dict(self.times),
+                'calls': dict(self.calls),
+                'counters': dict(self.counters),
+                'gauges': dict((name, dict(gauge)) for name, gauge in self.gauges.items())}
+
+    def merge(self, summary):
+        # Adds another summary (e.g. from gameReport['instrumentation']) to this one
+        self.games += summary['games']
+        for phase, seconds in summary['times'].items():
+            self.times[phase] = self.times.get(phase, 0.0) + seconds
+        for phase, calls in summary['calls'].items():
+            self.calls[phase] = self.calls.get(phase, 0) + calls
+        for name, amount in summary['counters'].items():
+            self.count(name, amount)
+        for name, other in summary['gauges'].items():
+            if name not in self.gauges:
+                self.gauges[name] = dict(other)
+            else:
+                gauge = self.gauges[name]
+                gauge['count'] += other['count']
+                gauge['total'] += other['total']
+                gauge['max'] = max(gauge['max'], other['max'])
+
+    def toJson(self, **kwargs):
+        return json.dumps(self.summary(), **kwargs)
+
+    def table(self):
+        games = max(self.games, 1)
+        lines = ['%-22s %10s %12s %12s %12s' % ('phase', 'calls', 'total ms', 'us/call', 'ms/game')]
+        for phase in sorted(self.times, key=self.times.get, reverse=True):
+            seconds = self.times[phase]
+            lines.append('%-22s %10d %12.2f %12.2f %12.3f' % (phase, self.calls[phase], seconds * 1e3,
+                            seconds * 1e6 / self.calls[phase], seconds * 1e3 / games))
+        lines.append('')
+        lines.append('%-22s %10s %12s' % ('counter', 'total', 'per game'))
+        for name in sorted(self.counters):
+            lines.append('%-22s %10d %12.2f' % (name, self.counters[name], self.counters[name] / games))
+        lines.append('')
+        lines.append('%-22s %10s %12s %12s' % ('gauge', 'samples', 'mean', 'max'))
+        for name in sorted(self.gauges):
+            gauge = self.gauges[name]
+            lines.append('%-22s %10d %12.2f %12s' % (name, gauge['count'], gauge['total'] / gauge['count'], gauge['max']))
+        return '\n'.join(lines)
@@ -0,0 +1,94 @@
+import os
+import random
+import numpy as np
+
+from ruleBasedAI import readAIConfig
+
+# Plays the dense network trained by ai.py, with the forward pass in numpy so playing
+# never imports keras or tensorflow.
+#
+# The network sees what getGameState gives it during training (the opponentView, flattened:
+# 1 hit, -1 miss, 0 not shot yet) and its highest Q value among the cells not shot yet is
+# the move. Weights are read from the .npz that ai.py saves, or from a keras .h5 weights
+# file (which needs h5py).
+
+def loadWeights(path):
+    # [kernel, bias, kernel, bias, ...] in layer order, like keras' model.get_weights()
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return [data['arr_%s' % i] for i in range(len(data.files))]
+    elif path.endswith('.h5'):
+        import h5py #only needed for keras weight files
+        weights = []
+        with h5py.File(path, 'r') as weightFile:
+            group = weightFile['model_weights'] if 'model_weights' in weightFile else weightFile
+            for layerName in group.attrs['layer_names']:
+                layer = group[layerName]
+                for weightName in layer.attrs['weight_names']:
+                    weights.append(np.array(layer[weightName]))
+        return weights
+    else:
+        raise ValueError('unknown weights format %s' % path)
+
+def saveWeights(weights, path):
+    np.savez(path, *weights)
+
+class DenseNetwork:
+    # Dense layers with relu activations except for the linear output layer, as in ai.build_model
+    networks = {} #path -> DenseNetwork, loaded once per process
+
+    @classmethod
+    def get(cls, path):
+        if path not in cls.networks:
+            if not os.path.exists(path):
+                raise ValueError('%s not found, train the network with ai.py first' % path)
+            cls.networks[path] = cls(loadWeights(path))
+        return cls.networks[path]
+
+    def __init__(self, weights):
+        if len(weights) % 2:
+            raise ValueError('expected a kernel and a bias per layer')
+        self.layers = [(np.asarray(weights[i], dtype=np.float32), np.asarray(weights[i+1], dtype=np.float32))
+                        for i in range(0, len(weights), 2)]
+        self.numInputs = self.layers[0][0].shape[0]
+        self.numOutputs = self.layers[-1][0].shape[1]
+
+    def forward(self, states):
+        #(batch, numInputs) -> (batch, numOutputs)
+        activations = np.asarray(states, dtype=np.float32)
+        for kernel, bias in self.layers[:-1]:
+            activations = np.maximum(np.dot(activations, kernel) + bias, 0)
+        kernel, bias = self.layers[-1]
+        return np.dot(activations, kernel) + bias
+
+    def bestMoves(self, states):
+        #highest Q value per row among the cells not shot yet (state 0)
+        q = self.forward(states)
+        return np.argmax(np.where(states == 0, q, -np.inf), axis=1)
+
+
+class NeuralAI:
+    def __init__(self, rows, columns, playerType, rng=random):
+        config = readAIConfig(playerType)
+        self.playerType = playerType
+        self.rng = rng #unused, the network plays deterministically
+        self.network = DenseNetwork.get(config['model'])
+        if self.network.numInputs != rows * columns or self.network.numOutputs != rows * columns:
+            raise ValueError('%s was trained for %s cells, not %sx%s' % (config['model'], self.network.numInputs, rows, columns))
+        self.rows = rows
+        self.columns = columns
+        self.state = np.zeros([1, rows * columns], dtype=np.float32)
+
+    def reset(self):
+        self.state.fill(0)
+
+    def getNextMove(self):
+        cell = int(self.network.bestMoves(self.state)[0])
+        return [cell // self.columns, cell % self.columns]
+
+    def executeTurn(self):
+        return self.getNextMove()
+
+    def postExecution(self, prevMove, isHit, sunkShip=None):
+        self.state[0, prevMove[0] * self.columns + prevMove[1]] = 1 if isHit else -1
+        return
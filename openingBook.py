@@ -0,0 +1,144 @@
+import os
+import json
+import logging
+import argparse
+import itertools
+from collections import Counter
+import numpy as np
+
+from placement import PlacementIndex
+
+logger = logging.getLogger(__name__)
+
+# Hunt phase targeting scores for RuleAI: for a board shape and the ships still afloat,
+# the number of placements of those ships covering each cell of an empty board. During a
+# game CrossedPlacements conditions a map on the shots taken so far, by taking out the
+# placements that cross a played cell.
+#
+# A book is a directory with one <rows>x<columns>.npy per board shape, holding the score
+# maps of every sub fleet of the fleet it was built for, and a <rows>x<columns>.json
+# listing the fleet key of each map. The .npy files are opened with mmap_mode='r', so
+# every process reading a book (e.g. GameBatch workers) shares the same read only pages
+# of the OS page cache instead of keeping its own copy.
+#
+#   $ python3 openingBook.py --rows 8 --columns 8 --ships 2 3 3 4 5 --path openingBook
+
+def fleetKey(ships):
+    return ','.join(str(int(length)) for length in sorted(ships))
+
+def subFleets(ships):
+    #every distinct non empty sub fleet, as sorted tuples
+    fleets = set()
+    for size in range(1, len(ships) + 1):
+        fleets.update(itertools.combinations(sorted(int(length) for length in ships), size))
+    return sorted(fleets)
+
+def placementDensity(rows, columns, ships):
+    index = PlacementIndex.get(rows, columns)
+    density = np.zeros([rows * columns,], dtype=float)
+    for length, count in Counter(int(length) for length in ships).items():
+        density += count * np.bincount(index.getPlacementCells(length).ravel(), minlength=rows * columns)
+    return density.reshape(rows, columns)
+
+def bookFiles(path, rows, columns):
+    name = os.path.join(path, '%sx%s' % (rows, columns))
+    return name + '.npy', name + '.json'
+
+def buildOpeningBook(path, rows, columns, ships):
+    fleets = subFleets(ships)
+    maps = np.stack([placementDensity(rows, columns, fleet) for fleet in fleets]).astype(np.float32)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    mapFile, indexFile = bookFiles(path, rows, columns)
+    np.save(mapFile, maps)
+    with open(indexFile, 'w') as outfile:
+        json.dump({'rows': rows, 'columns': columns, 'fleets': [fleetKey(fleet) for fleet in fleets]}, outfile)
+    return len(fleets)
+
+
+class OpeningBook:
+    books = {} #path -> OpeningBook, one per process
+
+    @classmethod
+    def get(cls, path):
+        if path not in cls.books:
+            cls.books[path] = cls(path)
+        return cls.books[path]
+
+    def __init__(self, path):
+        self.path = path
+        self.shapes = {} #(rows, columns) -> (memory mapped maps, {fleet key: map index}), None if not in the book
+        self.computed = {} #maps missing from the book, computed once per process
+
+    def loadShape(self, rows, columns):
+        if (rows, columns) not in self.shapes:
+            mapFile, indexFile = bookFiles(self.path, rows, columns)
+            if os.path.exists(mapFile) and os.path.exists(indexFile):
+                with open(indexFile) as infile:
+                    fleets = json.load(infile)['fleets']
+                self.shapes[(rows, columns)] = (np.load(mapFile, mmap_mode='r'), dict((key, i) for i, key in enumerate(fleets)))
+            else:
+                logger.warning('no %sx%s opening book in %s, build it with openingBook.py', rows, columns, self.path)
+                self.shapes[(rows, columns)] = None
+        return self.shapes[(rows, columns)]
+
+    def lookup(self, rows, columns, ships):
+        # Score map for the remaining ships, read only
+        key = fleetKey(ships)
+        shape = self.loadShape(rows, columns)
+        if shape is not None and key in shape[1]:
+            return shape[0][shape[1][key]]
+        if (rows, columns, key) not in self.computed:
+            self.computed[(rows, columns, key)] = placementDensity(rows, columns, ships)
+        return self.computed[(rows, columns, key)]
+
+
+class CrossedPlacements:
+    # Cells covered by the placements of each ship length that cross a played cell, kept
+    # up to date shot by shot (a shot only touches the placements covering its cell).
+    # While hunting every hit belongs to a sunk ship, so no ship afloat crosses any played
+    # cell, and a book map minus these counts scores the placements still possible.
+    def __init__(self, rows, columns, ships):
+        index = PlacementIndex.get(rows, columns)
+        self.rows = rows
+        self.columns = columns
+        self.cells = {}
+        self.covering = {}
+        self.crossed = {}
+        self.removed = {}
+        for length in set(int(length) for length in ships):
+            self.cells[length] = index.getPlacementCells(length)
+            self.covering[length] = index.getCoveringPlacements(length)
+            self.crossed[length] = np.zeros([len(self.cells[length]),], dtype=bool)
+            self.removed[length] = np.zeros([rows * columns,], dtype=float)
+
+    def reset(self):
+        for length in self.cells:
+            self.crossed[length].fill(False)
+            self.removed[length].fill(0)
+
+    def play(self, position):
+        cell = int(position[0] * self.columns + position[1])
+        for length in self.cells:
+            placementIds = self.covering[length][cell]
+            placementIds = placementIds[~self.crossed[length][placementIds]]
+            self.crossed[length][placementIds] = True
+            np.add.at(self.removed[length], self.cells[length][placementIds].ravel(), 1)
+
+    def scores(self, book, ships):
+        #book scores for the remaining ships, counting only the placements that cross no played cell
+        scores = np.array(book.lookup(self.rows, self.columns, ships), dtype=float).ravel()
+        for length, count in Counter(int(length) for length in ships).items():
+            scores -= count * self.removed[length]
+        return scores
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build an opening book for RuleAI.')
+    parser.add_argument('--rows', type=int, default=8, help='')
+    parser.add_argument('--columns', type=int, default=8, help='')
+    parser.add_argument('--ships', type=int, nargs='+', default=[2,3,3,4,5], help='')
+    parser.add_argument('--path', type=str, default='openingBook', help='book directory')
+    args = parser.parse_args()
+
+    numMaps = buildOpeningBook(args.path, args.rows, args.columns, args.ships)
+    print('%s score maps written to %s' % (numMaps, bookFiles(args.path, args.rows, args.columns)[0]))
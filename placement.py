@@ -0,0 +1,140 @@
+import random
+import numpy as np
+
+# Legal placements of ships on a rows x columns board, as (position, heading) with the
+# flat cell indices (row*columns + col) each one covers kept in arrays. Indexes are cached
+# per board shape, and the placements for a ship length are only built the first time
+# that length is asked for, which for fleet sampling is only when random draws stop
+# finding room (dense fleets).
+
+class PlacementIndex:
+    indexes = {}
+    RANDOM_ATTEMPTS = 20 #random draws per ship before listing the placements still free
+    MAX_SEARCH_PLACEMENTS = 5000 #placements tried by sampleFleet before giving up on a fleet
+
+    @classmethod
+    def get(cls, rows, columns):
+        if (rows, columns) not in cls.indexes:
+            cls.indexes[(rows, columns)] = cls(rows, columns)
+        return cls.indexes[(rows, columns)]
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.placements = {}
+        self.placementCells = {}
+        self.coveringPlacements = {}
+        self.unsatisfiable = set()
+
+    def getPlacements(self, length):
+        length = int(length)
+        if length not in self.placements:
+            placements = []
+            for row in range(self.rows):
+                for col in range(self.columns):
+                    if length <= self.rows - row:
+                        placements.append(((row, col), 'vertical'))
+                    if length <= self.columns - col:
+                        placements.append(((row, col), 'horizontal'))
+            self.placements[length] = placements
+        return self.placements[length]
+
+    def getPlacementCells(self, length):
+        #(numPlacements, length) array of the flat cell indices covered by each placement
+        length = int(length)
+        if length not in self.placementCells:
+            offsets = np.arange(length)
+            cells = [position[0] * self.columns + position[1] + offsets * (self.columns if heading == 'vertical' else 1)
+                        for position, heading in self.getPlacements(length)]
+            self.placementCells[length] = np.array(cells, dtype=int).reshape(-1, length)
+        return self.placementCells[length]
+
+    def getCoveringPlacements(self, length):
+        #for each flat cell index, the indices of the placements covering that cell
+        length = int(length)
+        if length not in self.coveringPlacements:
+            cells = self.getPlacementCells(length).ravel()
+            placementIds = np.argsort(cells, kind='mergesort') // length
+            counts = np.bincount(cells, minlength=self.rows * self.columns)
+            self.coveringPlacements[length] = np.split(placementIds, np.cumsum(counts)[:-1])
+        return self.coveringPlacements[length]
+
+    def checkFleet(self, ships):
+        #cheap necessary conditions, anything that passes these is settled by the search in sampleFleet
+        if tuple(ships) in self.unsatisfiable:
+            raise ValueError('fleet %s does not fit on a %sx%s board' % (list(ships), self.rows, self.columns))
+        if sum(ships) > self.rows * self.columns or any(length > max(self.rows, self.columns) for length in ships):
+            self.unsatisfiable.add(tuple(ships))
+            raise ValueError('fleet %s does not fit on a %sx%s board' % (list(ships), self.rows, self.columns))
+
+    def sampleFleet(self, ships, rng=random):
+        # Each ship is drawn uniformly from the placements that don't overlap the ships
+        # already placed, the same distribution as redrawing until isValidPlacement passes
+        # (and the same draws while those succeed). If a partial layout leaves no room for a
+        # later ship the search backtracks. It raises ValueError for fleets that can't be
+        # placed at all, or that it couldn't place within MAX_SEARCH_PLACEMENTS placements.
+        self.checkFleet(ships)
+        occupied = bytearray(self.rows * self.columns)
+        budget = [PlacementIndex.MAX_SEARCH_PLACEMENTS]
+        layout = self.search([int(length) for length in ships], 0, occupied, rng, budget, False)
+        if layout is None:
+            self.unsatisfiable.add(tuple(ships))
+            raise ValueError('fleet %s does not fit on a %sx%s board' % (list(ships), self.rows, self.columns))
+        return layout
+
+    def shipCells(self, position, length, heading):
+        start = position[0] * self.columns + position[1]
+        step = self.columns if heading == 'vertical' else 1
+        return range(start, start + length * step, step)
+
+    def randomPlacement(self, length, occupied, rng):
+        #rejection sampling, checked cell by cell against occupied
+        for attempt in range(PlacementIndex.RANDOM_ATTEMPTS):
+            heading = "vertical" if rng.randint(0,1) == 0 else "horizontal"
+            position = (rng.randint(0,self.rows-1), rng.randint(0,self.columns-1))
+            if heading == 'vertical' and length > self.rows - position[0]:
+                continue
+            if heading == 'horizontal' and length > self.columns - position[1]:
+                continue
+            if not any(occupied[cell] for cell in self.shipCells(position, length, heading)):
+                return (position, heading)
+        return None
+
+    def freePlacements(self, length, occupied):
+        #indices into getPlacements(length) of the placements not overlapping occupied
+        cells = self.getPlacementCells(length)
+        return list(np.flatnonzero(~np.frombuffer(occupied, dtype=np.uint8)[cells].any(axis=1)))
+
+    def search(self, ships, shipIdx, occupied, rng, budget, dense):
+        # Once random draws have failed for a ship, the board is too full for them to be
+        # worth trying for the ships after it
+        if shipIdx == len(ships):
+            return []
+        length = ships[shipIdx]
+        placement = None if dense else self.randomPlacement(length, occupied, rng)
+        candidates = None
+        if placement is None:
+            dense = True
+            candidates = self.freePlacements(length, occupied)
+        while True:
+            if candidates is not None:
+                if not candidates:
+                    return None
+                pick = rng.randint(0, len(candidates)-1)
+                candidates[pick], candidates[-1] = candidates[-1], candidates[pick]
+                placement = self.getPlacements(length)[candidates.pop()]
+            budget[0] -= 1
+            if budget[0] < 0:
+                raise ValueError('gave up placing fleet %s on a %sx%s board after %s placements'
+                                    % (ships, self.rows, self.columns, PlacementIndex.MAX_SEARCH_PLACEMENTS))
+            cells = self.shipCells(placement[0], length, placement[1])
+            for cell in cells:
+                occupied[cell] = 1
+            rest = self.search(ships, shipIdx + 1, occupied, rng, budget, dense)
+            for cell in cells:
+                occupied[cell] = 0
+            if rest is not None:
+                return [placement] + rest
+            if candidates is None:
+                #the random draw led nowhere, try the other free placements
+                candidates = [i for i in self.freePlacements(length, occupied) if self.getPlacements(length)[i] != placement]
@@ -0,0 +1,117 @@
+import random
+from collections import Counter
+import numpy as np
+
+from placement import PlacementIndex
+from ruleBasedAI import readAIConfig
+
+# Scores every cell by how many placements of the ships still afloat are
+# consistent with the shots so far. Placements through unresolved hits count
+# hitWeight times more per hit, which turns the search towards finishing off
+# a ship once one has been found.
+#
+# The per-cell counts are kept up to date incrementally: a shot only touches
+# the placements covering that cell (PlacementIndex.getCoveringPlacements).
+
+class ProbabilityAI:
+    def __init__(self, rows, columns, playerType, rng=random, ships=None):
+        if ships is None:
+            raise ValueError('ProbabilityAI needs the fleet')
+        config = readAIConfig(playerType)
+        self.playerType = playerType
+        self.rng = rng
+        self.hitWeight = float(config['hitWeight'])
+
+        self.rows = rows
+        self.columns = columns
+        self.ships = list(ships)
+        self.remaining = Counter()
+        index = PlacementIndex.get(rows, columns)
+        self.cells = {}
+        self.covering = {}
+        self.alive = {}
+        self.hitsCovered = {}
+        self.density = {}
+        self.hitDensity = {}
+        for length in set(int(length) for length in ships):
+            self.cells[length] = index.getPlacementCells(length)
+            self.covering[length] = index.getCoveringPlacements(length)
+            self.alive[length] = np.ones([len(self.cells[length]),], dtype=bool)
+            self.hitsCovered[length] = np.zeros([len(self.cells[length]),], dtype=int)
+            #density[length][cell]: live placements covering cell
+            #hitDensity[length][cell]: same, each placement counted once per unresolved hit it covers
+            self.density[length] = np.zeros([rows*columns,], dtype=float)
+            self.hitDensity[length] = np.zeros([rows*columns,], dtype=float)
+        self.shot = np.zeros([rows*columns,], dtype=bool)
+        self.unresolvedHits = set()
+        self.reset()
+
+    def reset(self):
+        self.remaining.clear()
+        self.remaining.update(int(length) for length in self.ships)
+        for length in self.cells:
+            self.alive[length].fill(True)
+            self.hitsCovered[length].fill(0)
+            self.density[length][:] = np.bincount(self.cells[length].ravel(), minlength=self.rows*self.columns)
+            self.hitDensity[length].fill(0)
+        self.shot.fill(False)
+        self.unresolvedHits.clear()
+
+    def killPlacements(self, length, placementIds):
+        placementIds = placementIds[self.alive[length][placementIds]]
+        self.alive[length][placementIds] = False
+        cells = self.cells[length][placementIds].ravel()
+        np.subtract.at(self.density[length], cells, 1)
+        np.subtract.at(self.hitDensity[length], cells, np.repeat(self.hitsCovered[length][placementIds], length))
+
+    def addHit(self, length, placementIds):
+        placementIds = placementIds[self.alive[length][placementIds]]
+        self.hitsCovered[length][placementIds] += 1
+        np.add.at(self.hitDensity[length], self.cells[length][placementIds].ravel(), 1)
+
+    def getScores(self):
+        scores = np.zeros([self.rows*self.columns,], dtype=float)
+        for length, count in self.remaining.items():
+            if count > 0:
+                scores += count * (self.density[length] + self.hitWeight * self.hitDensity[length])
+        scores[self.shot] = -1
+        return scores
+
+    def getNextMove(self):
+        scores = self.getScores()
+        best = np.flatnonzero(scores == scores.max())
+        cell = int(best[self.rng.randint(0, len(best)-1)])
+        return [cell // self.columns, cell % self.columns]
+
+    def executeTurn(self):
+        return self.getNextMove()
+
+    def resolveSunk(self, cell, length):
+        # The board only says which ship sank, so pick a live placement of that ship
+        # through the last hit made up entirely of unresolved hits as its position
+        self.remaining[length] -= 1
+        sunkCells = [cell]
+        for placementId in self.covering[length][cell]:
+            placementCells = self.cells[length][placementId]
+            if self.alive[length][placementId] and all(c in self.unresolvedHits for c in placementCells):
+                sunkCells = placementCells
+                break
+        #nothing else can overlap the sunk ship, and its hits no longer need following up
+        for sunkCell in sunkCells:
+            self.unresolvedHits.discard(int(sunkCell))
+            for otherLength in self.cells:
+                self.killPlacements(otherLength, self.covering[otherLength][sunkCell])
+
+    def postExecution(self, prevMove, isHit, sunkShip=None):
+        cell = int(prevMove[0] * self.columns + prevMove[1])
+        self.shot[cell] = True
+        if isHit:
+            self.unresolvedHits.add(cell)
+            for length in self.cells:
+                self.addHit(length, self.covering[length][cell])
+            if sunkShip is not None:
+                self.resolveSunk(cell, self.ships[sunkShip])
+        else:
+            for length in self.cells:
+                self.killPlacements(length, self.covering[length][cell])
+        return
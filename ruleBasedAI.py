@@ -1,59 +1,284 @@
 import configparser
+import logging
+import heapq
 from collections import deque
-from random import randint
+import random
 import numpy as np
 
+from openingBook import OpeningBook, CrossedPlacements
+
+logger = logging.getLogger(__name__)
+
+# Parsed config files, read once per process
+configCache = {}
+
+# Section of config.ini for an AI player type
+def readAIConfig(playerType, path='config.ini'):
+    if path not in configCache:
+        config = configparser.ConfigParser()
+        config.read(path)
+        configCache[path] = config
+    return configCache[path][playerType]
+
+# Forget the parsed configs so the next AI created reads the file again
+def reloadAIConfigs():
+    configCache.clear()
+
+# Adds (or replaces) an AI section in the parsed config only, so player types can be made up
+# at runtime (see tuneRuleAI.py). Missing keys come from DEFAULT as usual. Gone after
+# reloadAIConfigs, and each process has to register its own.
+def registerAIConfig(playerType, values, path='config.ini'):
+    readAIConfig('DEFAULT', path)
+    config = configCache[path]
+    if config.has_section(playerType):
+        config.remove_section(playerType)
+    config.read_dict({playerType: dict((key, str(value)) for key, value in values.items())})
+
+# Candidate moves keyed by cell, popped best score first. Ties go to the move nearest the
+# front of the queue, i.e. the one most recently pushed to the front (moves pushed to the
+# back queue up behind everything else). Pushing a cell that is already queued just updates
+# its move and position instead of adding a duplicate.
+#
+# Scores are cached in a heap and only recomputed for cells marked dirty, the heap entries
+# they replace are skipped when they reach the top (lazy invalidation).
+class MoveQueue:
+    def __init__(self):
+        self.entries = {} #cell -> [move, order, version]
+        self.heap = []
+        self.dirty = set()
+        self.frontOrder = 0
+        self.backOrder = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        del self.heap[:]
+        self.dirty.clear()
+        self.frontOrder = 0
+        self.backOrder = 0
+
+    def __iter__(self):
+        return iter([entry[0] for entry in self.entries.values()])
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def push(self, move, front=True):
+        cell = (move[0], move[1])
+        entry = self.entries.get(cell)
+        if front:
+            self.frontOrder += 1
+            order = self.frontOrder
+        elif entry is not None:
+            order = entry[1] #the copy already queued is the one nearer the front
+        else:
+            self.backOrder -= 1
+            order = self.backOrder
+        if entry is None:
+            self.entries[cell] = [move, order, 0]
+        else:
+            entry[0] = move
+            entry[1] = order
+        self.dirty.add(cell)
+
+    def discard(self, cell):
+        self.entries.pop(cell, None)
+        self.dirty.discard(cell)
+
+    def markDirty(self, cells):
+        for cell in cells:
+            if cell in self.entries:
+                self.dirty.add(cell)
+
+    def popBest(self, evaluateMove):
+        if len(self.entries) == 1:
+            #nothing to rank (always the case for RANDOM), so the score map is never needed
+            move = self.entries.popitem()[1][0]
+            self.clear()
+            return move
+        for cell in self.dirty:
+            entry = self.entries[cell]
+            entry[2] += 1
+            heapq.heappush(self.heap, (-evaluateMove(entry[0]), -entry[1], entry[2], cell))
+        self.dirty.clear()
+        if len(self.heap) > 4 * len(self.entries) + 64:
+            self.heap = [item for item in self.heap if self.isCurrent(item)]
+            heapq.heapify(self.heap)
+        while True:
+            item = heapq.heappop(self.heap)
+            if self.isCurrent(item):
+                return self.entries.pop(item[3])[0]
+
+    def isCurrent(self, item):
+        entry = self.entries.get(item[3])
+        return entry is not None and entry[2] == item[2]
+
+# Cells not played yet, for uniform sampling and removal in O(1). The cells are kept in a
+# list along with each cell's index in it, and a removed cell is swapped with the last
+# unplayed one, so the unplayed cells are always cells[:count].
+class UnplayedCells:
+    def __init__(self, rows, columns):
+        self.columns = columns
+        self.size = rows * columns
+        self.cells = list(range(self.size))
+        self.indices = list(range(self.size)) #cell -> index in cells
+        self.count = self.size
+
+    def __len__(self):
+        return self.count
+
+    def reset(self):
+        #back to the initial order, so a reset game samples like a new one
+        self.cells[:] = range(self.size)
+        self.indices[:] = range(self.size)
+        self.count = self.size
+
+    def discard(self, position):
+        cell = position[0] * self.columns + position[1]
+        index = self.indices[cell]
+        if index >= self.count:
+            return
+        self.count -= 1
+        last = self.cells[self.count]
+        self.cells[index] = last
+        self.indices[last] = index
+        self.cells[self.count] = cell
+        self.indices[cell] = self.count
+
+    def sample(self, rng):
+        cell = self.cells[rng.randint(0, self.count-1)]
+        return [cell // self.columns, cell % self.columns]
+
+
 class RuleAI:
 
     DIRECTION_MAPPING = {0:[-1,0],1:[0,1],2:[1,0],3:[0,-1]}
+    QUEUE_INDEX = {'greedy': 0, 'lazy': -1} #where the moves around a hit are queued
 
-    def __init__(self, rows, columns, playerType):
-        config = configparser.ConfigParser()
-        config.read('config.ini')
+    def __init__(self, rows, columns, playerType, rng=random, instrumentation=None, ships=None):
+        config = readAIConfig(playerType)
         self.playerType = playerType
+        self.rng = rng
+        self.instrumentation = instrumentation
 
         #Config from file
-        self.epsilon = float(config[playerType]['epsilon'])
-        self.adjacent1HitValue = int(config[playerType]['adjacent1HitValue'])
-        #Could parameterize the rest as well...
+        self.epsilon = float(config['epsilon'])
+        self.adjacent1HitValue = int(config['adjacent1HitValue'])
+        self.firstTierHitValue = float(config['firstTierHitValue'])
+        self.firstTierMissValue = float(config['firstTierMissValue'])
+        self.secondTierHitValue = float(config['secondTierHitValue'])
+        self.secondTierMissValue = float(config['secondTierMissValue'])
+        self.bothTiersHitValue = float(config['bothTiersHitValue'])
+        self.bothTiersMissValue = float(config['bothTiersMissValue'])
+        self.hitThenUnvisitedValue = float(config['hitThenUnvisitedValue'])
+        self.unvisitedThenHitValue = float(config['unvisitedThenHitValue'])
+        if config['queueIndex'] not in RuleAI.QUEUE_INDEX:
+            raise ValueError('queueIndex must be greedy or lazy, not %s' % config['queueIndex'])
+        self.queueIndex = RuleAI.QUEUE_INDEX[config['queueIndex']]
+        self.stencilTable = self.buildStencilTable()
+        # Hunt moves come from the opening book (see openingBook.py) when one is configured
+        self.openingBook = OpeningBook.get(config['openingBook']) if config['openingBook'] else None
+        if self.openingBook is not None and ships is None:
+            raise ValueError('the opening book needs the fleet')
 
         self.rows = rows
         self.columns = columns
         self.boardState = np.zeros([rows, columns], dtype=int)
-        self.moveQueue = []
+        self.scoreMap = None #evaluateMove score of every cell, built on first use and then kept up to date by setBoardState
+        self.moveQueue = MoveQueue()
+        self.unplayed = UnplayedCells(rows, columns)
         # self.hitQueue = deque()
+        self.ships = None if ships is None else [int(length) for length in ships]
+        self.shipsAfloat = None if ships is None else list(self.ships)
+        self.unresolvedHits = 0 #hits not yet accounted for by a sunk ship
+        self.crossedPlacements = None if self.openingBook is None else CrossedPlacements(rows, columns, self.ships)
         return
 
+    def reset(self):
+        self.boardState.fill(0)
+        self.scoreMap = None
+        self.moveQueue.clear()
+        self.unplayed.reset()
+        if self.ships is not None:
+            self.shipsAfloat = list(self.ships)
+        self.unresolvedHits = 0
+        if self.crossedPlacements is not None:
+            self.crossedPlacements.reset()
+
     def addMoveToQueue(self, position, index = -1):
         if self.isWithinBoard(position):
             if not self.hasBeenPlayed(position):
-                #could evaluate the move upon insertion for speed, but the ranking could change based on the board state
-                self.moveQueue.insert(index, position)
+                #moves are scored when they're popped, since the ranking could change based on the board state
+                self.moveQueue.push(position, front = index == 0)
                 return True
         return False
 
     def getBestMove(self):
-        moveRankings = []
-        for move in self.moveQueue:
-            currentMoveRanking = self.evaluateMove(move)
-            moveRankings.append(currentMoveRanking)
-        print("moveRankings:", moveRankings, "moveQueue", self.moveQueue)
-        maxIdx = np.argmax(moveRankings)
-        return self.moveQueue.pop(maxIdx)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("moveQueue %s", self.moveQueue)
+        if self.instrumentation is not None:
+            self.instrumentation.gauge('queueLength', len(self.moveQueue))
+        return self.moveQueue.popBest(self.evaluateMove)
 
     def evaluateMove(self, move):
-        firstTierScore = self.evaluateFirstTier(move)
-        secondTierScore = self.evaluateSecondTier(move)
-        bothTiersScore = self.evaluateBothTiers(move)
-
-        #not currently being used...
-        isOnEdge = self.isEdge(move)
-        isInCorner = self.isCorner(move)
-
-        score = firstTierScore + secondTierScore + bothTiersScore
-
+        if self.scoreMap is None:
+            if self.instrumentation is not None:
+                self.instrumentation.count('scoreMapBuilds')
+            self.scoreMap = self.evaluateBoard()
+        return self.scoreMap[move[0], move[1]]
+
+    # Cell codes for the stencil: boardState + 1 (0 miss, 1 unvisited, 2 hit), 3 is off the board
+    def buildStencilTable(self):
+        #stencilTable[near][far]: score one direction adds for the cells one (near) and two (far) steps away
+        firstTier = [self.firstTierMissValue, 0, self.firstTierHitValue, 0]
+        secondTier = [self.secondTierMissValue, 0, self.secondTierHitValue, 0]
+        table = [[firstTier[near] + secondTier[far] for far in range(4)] for near in range(4)]
+        table[2][2] += self.bothTiersHitValue
+        table[0][0] += self.bothTiersMissValue
+        table[2][1] += self.hitThenUnvisitedValue
+        table[1][2] += self.unvisitedThenHitValue
+        return table
+
+    def cellCode(self, position):
+        if 0 <= position[0] < self.rows and 0 <= position[1] < self.columns:
+            return self.boardState[position[0], position[1]] + 1
+        return 3
+
+    def evaluateBoard(self):
+        # Same score as evaluateFirstTier + evaluateSecondTier + evaluateBothTiers, for every
+        # cell at once, by looking up the stencil table with shifted views of the padded board
+        table = np.array(self.stencilTable, dtype=float)
+        padded = np.full([self.rows + 4, self.columns + 4], 3, dtype=int)
+        padded[2:-2, 2:-2] = self.boardState + 1
+        score = np.zeros([self.rows, self.columns], dtype=float)
+        for relativePosition in RuleAI.DIRECTION_MAPPING.values():
+            near = padded[2 + relativePosition[0]:2 + relativePosition[0] + self.rows,
+                            2 + relativePosition[1]:2 + relativePosition[1] + self.columns]
+            far = padded[2 + relativePosition[0]*2:2 + relativePosition[0]*2 + self.rows,
+                            2 + relativePosition[1]*2:2 + relativePosition[1]*2 + self.columns]
+            score += table[near, far]
         return score
 
+    def setBoardState(self, position, value):
+        # A cell is the near cell for the cell one step behind it and the far cell for the
+        # one two steps behind it, so only those 8 scores change
+        oldCode = self.boardState[position[0], position[1]] + 1
+        self.boardState[position[0], position[1]] = value
+        if self.scoreMap is None:
+            return
+        newCode = value + 1
+        for relativePosition in RuleAI.DIRECTION_MAPPING.values():
+            behind1 = [position[0] - relativePosition[0], position[1] - relativePosition[1]]
+            behind2 = [position[0] - relativePosition[0]*2, position[1] - relativePosition[1]*2]
+            if self.isWithinBoard(behind1):
+                farCode = self.cellCode([position[0] + relativePosition[0], position[1] + relativePosition[1]])
+                self.scoreMap[behind1[0], behind1[1]] += self.stencilTable[newCode][farCode] - self.stencilTable[oldCode][farCode]
+                if self.isWithinBoard(behind2):
+                    nearCode = self.boardState[behind1[0], behind1[1]] + 1
+                    self.scoreMap[behind2[0], behind2[1]] += self.stencilTable[nearCode][newCode] - self.stencilTable[nearCode][oldCode]
+
     def evaluateFirstTier(self, move):
         score = 0
         for i in [0,1,2,3]:
@@ -62,9 +287,9 @@ class RuleAI:
             if self.isWithinBoard(evaluationPosition):
                 val = self.boardState[evaluationPosition[0], evaluationPosition[1]]
                 if val == 1: #Hit
-                    score += 1 #self.adjacent1HitValue
+                    score += self.firstTierHitValue
                 elif val == -1: #Miss
-                    score -= 1
+                    score += self.firstTierMissValue
                 elif val == 0: #Unvisited
                     continue
                 else:
@@ -79,9 +304,9 @@ class RuleAI:
             if self.isWithinBoard(evaluationPosition):
                 val = self.boardState[evaluationPosition[0], evaluationPosition[1]]
                 if val == 1: #Hit
-                    score += 0.5
+                    score += self.secondTierHitValue
                 elif val == -1: #Miss
-                    score -= 0.5
+                    score += self.secondTierMissValue
                 elif val == 0: #Unvisited
                     continue
                 else:
@@ -98,13 +323,13 @@ class RuleAI:
                 val1 = self.boardState[evaluationPosition1[0], evaluationPosition1[1]]
                 val2 = self.boardState[evaluationPosition2[0], evaluationPosition2[1]]
                 if min([val1,val2]) == 1: #Hit
-                    score += 0.5
+                    score += self.bothTiersHitValue
                 elif max([val1,val2]) == -1: #Miss
-                    score -= 0.5
+                    score += self.bothTiersMissValue
                 elif val1 == 1 and val2 == 0:
-                    score += 20
+                    score += self.hitThenUnvisitedValue
                 elif val1 == 0 and val2 == 1:
-                    score -+ 2
+                    score += self.unvisitedThenHitValue
                 else:
                     continue
         return score
@@ -141,17 +366,26 @@ class RuleAI:
             return False
 
     def isWithinBoard(self, position):
-        if position[0] not in range(self.rows) or position[1] not in range(self.columns):
-            return False
-        else:
-            return True
+        return 0 <= position[0] < self.rows and 0 <= position[1] < self.columns
+
+    def markNeighboursDirty(self, position):
+        #the tier scores look up to two cells away in each direction
+        cells = []
+        for relativePosition in RuleAI.DIRECTION_MAPPING.values():
+            for distance in [1,2]:
+                cells.append((position[0] + relativePosition[0]*distance, position[1] + relativePosition[1]*distance))
+        self.moveQueue.markDirty(cells)
 
     def isQueueEmpty(self):
         return len(self.moveQueue) == 0
 
     def getNextMove(self):
-        while self.isQueueEmpty():
-            #if no moves are left, generate random moves and add them to the queue
+        if self.openingBook is not None and self.unresolvedHits == 0:
+            #every hit so far belongs to a sunk ship, what's left in the queue was around those
+            self.moveQueue.clear()
+            return self.getBookMove()
+        if self.isQueueEmpty():
+            #if no moves are left, add a random one to the queue
             self.generateRandomMove()
         #moves are sanitized (checked for validity and prior use) before adding to queue
         #within self.addMoveToQueue()
@@ -159,8 +393,23 @@ class RuleAI:
         # return self.moveQueue.popleft()
         return self.getBestMove()
 
+    def getBookMove(self):
+        # Unplayed cell drawn with probability proportional to its book score for the ships afloat,
+        # leaving out the placements that cross a cell already played
+        scores = self.crossedPlacements.scores(self.openingBook, self.shipsAfloat)
+        weights = np.where(self.boardState.ravel() == 0, scores, 0)
+        cumulative = np.cumsum(weights)
+        if cumulative[-1] <= 0:
+            weights = (self.boardState == 0).ravel().astype(float)
+            cumulative = np.cumsum(weights)
+        cell = int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side='right'))
+        return [cell // self.columns, cell % self.columns, 0]
+
     def generateRandomMove(self):
-        return self.addMoveToQueue([randint(0,self.rows-1),randint(0,self.columns-1), 0], index = 0)
+        #uniform over the unplayed cells, the same as drawing any cell until one hasn't been played
+        if len(self.unplayed) == 0:
+            return False
+        return self.addMoveToQueue(self.unplayed.sample(self.rng) + [0], index = 0)
 
     def generateAdjacentMoves(self, position, directionIndices, queueIndex):
         for directionIndex in directionIndices:
@@ -168,7 +417,7 @@ class RuleAI:
             newRow = position[0] + relativePosition[0]
             newColumn = position[1] + relativePosition[1]
             move = [newRow, newColumn, directionIndex]
-            self.addMoveToQueue(move, queueIndex) #queueIndex will be configurable
+            self.addMoveToQueue(move, queueIndex)
 
     def generateAllAdjacentMoves(self, position, queueIndex):
         self.generateAdjacentMoves(position, [0,1,2,3], queueIndex)
@@ -197,20 +446,26 @@ class RuleAI:
     def executeTurn(self):
         return self.getNextMove()
 
-    def postExecution(self,prevMove, isHit):
+    def postExecution(self,prevMove, isHit, sunkShip=None):
         # Need to keep track of last move, direction of exploration, to determine which branch to go down...
         # moveDirection
         # isHit?
+        self.moveQueue.discard((prevMove[0], prevMove[1]))
+        self.unplayed.discard(prevMove)
+        self.markNeighboursDirty(prevMove)
+        if self.crossedPlacements is not None:
+            self.crossedPlacements.play(prevMove)
+        if isHit and self.ships is not None:
+            self.unresolvedHits += 1
+            if sunkShip is not None:
+                self.unresolvedHits -= self.ships[sunkShip]
+                self.shipsAfloat.remove(self.ships[sunkShip])
         if isHit:
-            self.boardState[prevMove[0],prevMove[1]] = 1
-            if np.random.rand() <= self.epsilon:
-                i = 0
-                while not self.generateRandomMove(): #keep trying to add random moves until one succeeds
-                    i+=1
-                    if i>100: #necessary because at towards the end of the game there could be no more allowable moves
-                        break
+            self.setBoardState(prevMove, 1)
+            if self.rng.random() <= self.epsilon:
+                self.generateRandomMove() #fails only once every cell has been played
             else:
-                self.generateAllAdjacentMoves(prevMove, 0) #queueIndex = 0 is GREEDY, queueIndex = -1 is LAZY
+                self.generateAllAdjacentMoves(prevMove, self.queueIndex)
         else:
-            self.boardState[prevMove[0],prevMove[1]] = -1
+            self.setBoardState(prevMove, -1)
         return
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from game import Board
+from events import EventBus
+from ruleBasedAI import readAIConfig
+
+logger = logging.getLogger(__name__)
+
+# Line protocol server for human (or bot) vs AI games, one game per connection at a time
+# and any number of connections served by one asyncio event loop.
+#
+# Client -> server
+#   NEW [playerType [seed]]  new game against an AI (config.ini section, default AI), you move first
+#   SHOT row col             fire at the AI's board (zero indexed)
+#   VIEW                     your view of the AI's board and the state of your own fleet
+#   QUIT                     close the connection
+# Server -> client
+#   OK rows columns ship ...                      game started
+#   HIT row col | MISS row col | SUNK length      result of your shot
+#   OPPONENT HIT row col | OPPONENT MISS row col | OPPONENT SUNK length
+#   WIN moves | LOSE moves                        game over (send NEW to play again)
+#   TARGET / FLEET followed by one line per row, then END     (VIEW)
+#   ERR message | TIMEOUT | BYE
+#
+# The rules are the usual Board/PlayerBoard ones, with the AI's turns played through
+# PlayerBoard.executeTurn either inline or in a thread pool, and the results reported from
+# the board events.
+#
+#   $ python3 server.py --port 8765
+#   $ nc localhost 8765
+
+TARGET_MAPPING = {-1: 'o', 0: '.', 1: 'x'}
+
+class Session:
+    def __init__(self, rows, columns, ships, playerType, seed=None):
+        self.messages = []
+        self.events = EventBus()
+        for event in ['hit', 'miss', 'shipSunk', 'gameOver']:
+            self.events.subscribe(event, getattr(self, event))
+        #player 1 is the client, who shoots at board1
+        self.board = Board(rows, columns, 'Human', playerType, ships, False, seed, self.events)
+        self.human = self.board.board1
+        self.opponent = self.board.board2
+        self.over = False
+
+    def prefix(self, board):
+        return '' if board is self.human else 'OPPONENT '
+
+    def hit(self, board, position):
+        self.messages.append('%sHIT %s %s' % (self.prefix(board), position[0], position[1]))
+
+    def miss(self, board, position):
+        self.messages.append('%sMISS %s %s' % (self.prefix(board), position[0], position[1]))
+
+    def shipSunk(self, board, shipIndex):
+        self.messages.append('%sSUNK %s' % (self.prefix(board), board.shipLengths[shipIndex]))
+
+    def gameOver(self, board, gameReport):
+        self.over = True
+        self.messages.append('%s %s' % ('WIN' if board is self.human else 'LOSE', gameReport['winnerNumMoves']))
+
+    def humanTurn(self, position):
+        self.human.shoot(position)
+        self.human.isGameOver()
+
+    def aiTurn(self):
+        self.opponent.executeTurn()
+
+    def view(self):
+        lines = ['TARGET']
+        for row in self.human.opponentView:
+            lines.append(''.join(TARGET_MAPPING[int(value)] for value in row))
+        lines.append('FLEET')
+        #ship number where it's afloat, x where it's been hit, o where the AI missed
+        grid = self.opponent.grid
+        for row in grid:
+            lines.append(''.join('.' if value == 0 else 'o' if value < -self.opponent.numShips else 'x' if value < 0 else str(value)
+                                    for value in row))
+        lines.append('END')
+        return lines
+
+
+class GameServer:
+    def __init__(self, rows=8, columns=8, ships=[2,3,3,4,5], timeout=300, maxSessions=10000, executorThreads=0,
+                    maxConcurrentTurns=64):
+        self.rows = rows
+        self.columns = columns
+        self.ships = ships
+        self.timeout = timeout #seconds a client may stay silent before the session is closed
+        self.maxSessions = maxSessions
+        self.numSessions = 0
+        # AI turns are played inline unless there are executor threads, which keeps the event
+        # loop responsive when an AI is slow (large boards). Either way at most
+        # maxConcurrentTurns are in flight.
+        self.executor = ThreadPoolExecutor(executorThreads) if executorThreads > 0 else None
+        self.turnSlots = asyncio.Semaphore(maxConcurrentTurns)
+
+    async def send(self, writer, lines):
+        writer.write(''.join(line + '\n' for line in lines).encode())
+        await writer.drain() #waits while the client isn't reading, so a slow client can't pile up output
+
+    async def playAITurn(self, session):
+        async with self.turnSlots:
+            if self.executor is None:
+                session.aiTurn()
+            else:
+                await asyncio.get_running_loop().run_in_executor(self.executor, session.aiTurn)
+
+    async def handleCommand(self, session, fields):
+        # Returns the session to continue with and the lines to send back
+        command = fields[0].upper()
+        if command == 'NEW':
+            playerType = fields[1] if len(fields) > 1 else 'AI'
+            if playerType == 'Human':
+                return session, ['ERR the opponent has to be an AI']
+            try:
+                readAIConfig(playerType)
+            except KeyError:
+                return session, ['ERR unknown player type %s' % playerType]
+            seed = fields[2] if len(fields) > 2 else None
+            try:
+                session = Session(self.rows, self.columns, self.ships, playerType, seed)
+            except (KeyError, ValueError) as error:
+                #e.g. an NN section whose model hasn't been trained, or a section without a usable strategy
+                return session, ['ERR cannot play %s: %s' % (playerType, error)]
+            return session, ['OK %s %s %s' % (self.rows, self.columns, ' '.join(str(length) for length in self.ships))]
+        if command in ['SHOT', 'VIEW'] and (session is None or session.over):
+            return session, ['ERR no game in progress, send NEW']
+        if command == 'VIEW':
+            return session, session.view()
+        if command == 'SHOT':
+            try:
+                position = [int(fields[1]), int(fields[2])]
+            except (IndexError, ValueError):
+                return session, ['ERR usage: SHOT row col']
+            if len(fields) != 3 or not session.human.isValidShot(position):
+                return session, ['ERR invalid shot']
+            session.messages = []
+            session.humanTurn(position)
+            if not session.over:
+                await self.playAITurn(session)
+            return session, session.messages
+        return session, ['ERR unknown command %s' % command]
+
+    async def handleClient(self, reader, writer):
+        if self.numSessions >= self.maxSessions:
+            await self.send(writer, ['ERR server busy'])
+            writer.close()
+            return
+        self.numSessions += 1
+        session = None
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                except asyncio.TimeoutError:
+                    await self.send(writer, ['TIMEOUT'])
+                    break
+                except ValueError: #line longer than the stream limit
+                    await self.send(writer, ['ERR line too long'])
+                    break
+                if not line:
+                    break
+                fields = line.decode(errors='replace').split()
+                if not fields:
+                    continue
+                if fields[0].upper() == 'QUIT':
+                    await self.send(writer, ['BYE'])
+                    break
+                session, lines = await self.handleCommand(session, fields)
+                await self.send(writer, lines)
+        except ConnectionError:
+            logger.debug('client disconnected')
+        finally:
+            self.numSessions -= 1
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765, path=None, backlog=1024):
+        # Listening asyncio server (port 0 picks a free port, see server.sockets)
+        #limit bounds how much of a line is buffered per connection
+        if path is not None:
+            return await asyncio.start_unix_server(self.handleClient, path, limit=1024, backlog=backlog)
+        return await asyncio.start_server(self.handleClient, host, port, limit=1024, backlog=backlog)
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None, backlog=1024):
+        server = await self.start(host, port, path, backlog)
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve games against the AIs over a line protocol.')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='')
+    parser.add_argument('--port', type=int, default=8765, help='')
+    parser.add_argument('--unix', type=str, default=None, help='listen on this unix socket instead of TCP')
+    parser.add_argument('--timeout', type=float, default=300, help='seconds a client may stay idle')
+    parser.add_argument('--max-sessions', type=int, default=10000, help='connections served at once')
+    parser.add_argument('--executor-threads', type=int, default=0, help='play AI turns in a thread pool of this size (0 plays them inline)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    async def main():
+        gameServer = GameServer(timeout=args.timeout, maxSessions=args.max_sessions, executorThreads=args.executor_threads)
+        await gameServer.serve(args.host, args.port, args.unix)
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+import random
+from collections import Counter
+
+from ruleBasedAI import readAIConfig
+
+# Hunt/target AI whose state is only the cells it has shot at, for boards far too large for
+# per cell arrays (see sparseBoard.py).
+#
+# Hunting, it shoots random unplayed cells on a parity lattice spaced by the shortest ship
+# still afloat (every ship covers at least one lattice cell). Once it has hits that don't
+# belong to a sunk ship, it only considers the frontier: unplayed cells next to those hits,
+# scored by how many hits they touch and how many lines of hits they extend.
+
+class SparseAI:
+    DIRECTIONS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    MAX_HUNT_ATTEMPTS = 1000 #random draws on the lattice before falling back to any unplayed cell
+
+    def __init__(self, rows, columns, playerType, rng=random, ships=None):
+        if ships is None:
+            raise ValueError('SparseAI needs the fleet')
+        config = readAIConfig(playerType)
+        self.playerType = playerType
+        self.rng = rng
+        self.lineValue = float(config['lineValue'])
+        self.useParity = config.getboolean('parity')
+
+        self.rows = rows
+        self.columns = columns
+        self.ships = [int(length) for length in ships]
+        self.remaining = Counter()
+        self.played = set()
+        self.unresolvedHits = set()
+        self.frontier = set()
+        self.reset()
+
+    def reset(self):
+        self.remaining.clear()
+        self.remaining.update(self.ships)
+        self.played.clear()
+        self.unresolvedHits.clear()
+        self.frontier.clear()
+
+    def isWithinBoard(self, cell):
+        return 0 <= cell[0] < self.rows and 0 <= cell[1] < self.columns
+
+    def neighbours(self, cell):
+        return [(cell[0] + direction[0], cell[1] + direction[1]) for direction in SparseAI.DIRECTIONS]
+
+    def scoreFrontierCell(self, cell):
+        score = 0
+        for direction in SparseAI.DIRECTIONS:
+            near = (cell[0] + direction[0], cell[1] + direction[1])
+            if near in self.unresolvedHits:
+                score += 1
+                if (near[0] + direction[0], near[1] + direction[1]) in self.unresolvedHits:
+                    score += self.lineValue
+        return score
+
+    def getTargetMove(self):
+        scores = dict((cell, self.scoreFrontierCell(cell)) for cell in self.frontier)
+        bestScore = max(scores.values())
+        best = sorted(cell for cell, score in scores.items() if score == bestScore)
+        return best[self.rng.randint(0, len(best)-1)]
+
+    def getHuntMove(self):
+        spacing = min(length for length, count in self.remaining.items() if count > 0) if self.useParity else 1
+        for attempt in range(SparseAI.MAX_HUNT_ATTEMPTS):
+            row = self.rng.randint(0, self.rows - 1)
+            col = self.rng.randint(0, self.columns - 1)
+            col -= (row + col) % spacing
+            if col >= 0 and (row, col) not in self.played:
+                return (row, col)
+        #only on small or nearly finished boards
+        unplayed = [(row, col) for row in range(self.rows) for col in range(self.columns) if (row, col) not in self.played]
+        return unplayed[self.rng.randint(0, len(unplayed)-1)]
+
+    def getNextMove(self):
+        cell = self.getTargetMove() if self.frontier else self.getHuntMove()
+        return [cell[0], cell[1]]
+
+    def executeTurn(self):
+        return self.getNextMove()
+
+    def resolveSunk(self, cell, length):
+        # The board only says which ship sank, take a line of unresolved hits of that length
+        # through the last hit as its position
+        self.remaining[length] -= 1
+        sunkCells = [cell]
+        for direction in [(0, 1), (1, 0)]:
+            for start in range(length):
+                line = [(cell[0] + direction[0] * (i - start), cell[1] + direction[1] * (i - start)) for i in range(length)]
+                if all(lineCell in self.unresolvedHits for lineCell in line):
+                    sunkCells = line
+                    break
+            else:
+                continue
+            break
+        for sunkCell in sunkCells:
+            self.unresolvedHits.discard(sunkCell)
+        #keep only the frontier cells that still touch an unresolved hit
+        self.frontier = set(frontierCell for frontierCell in self.frontier
+                                if any(near in self.unresolvedHits for near in self.neighbours(frontierCell)))
+
+    def postExecution(self, prevMove, isHit, sunkShip=None):
+        cell = (prevMove[0], prevMove[1])
+        self.played.add(cell)
+        self.frontier.discard(cell)
+        if isHit:
+            self.unresolvedHits.add(cell)
+            for near in self.neighbours(cell):
+                if self.isWithinBoard(near) and near not in self.played:
+                    self.frontier.add(near)
+            if sunkShip is not None:
+                self.resolveSunk(cell, self.ships[sunkShip])
+        return
@@ -0,0 +1,100 @@
+import numpy as np
+
+from game import PlayerBoard
+
+# PlayerBoard for very large boards: the ships are a dict from cell to ship index and the
+# shots are sets of cells, so memory and the cost of a turn depend on the number of ships
+# and shots, never on rows*columns. Pair it with SPARSE players (sparseAI.py), the other
+# AIs keep dense per cell state of their own.
+
+class SparsePlayerBoard(PlayerBoard):
+    MAX_PLACEMENT_ATTEMPTS = 1000 #random positions tried per ship before giving up on the fleet
+
+    def initCells(self):
+        self.cellShips = {} #(row, col) -> ship index
+        self.shots = set()
+        self.hits = set()
+
+    def clearCells(self):
+        self.cellShips.clear()
+        self.shots.clear()
+        self.hits.clear()
+
+    def shipCells(self, position, length, heading):
+        if heading == "vertical":
+            return [(position[0] + i, position[1]) for i in range(length)]
+        elif heading == "horizontal":
+            return [(position[0], position[1] + i) for i in range(length)]
+        else:
+            raise ValueError
+
+    def isValidPlacement(self, position, length, heading):
+        if not (0 <= position[0] < self.rows and 0 <= position[1] < self.columns):
+            return False
+        if heading == "vertical":
+            if length > self.rows - position[0]:
+                return False
+        elif heading == "horizontal":
+            if length > self.columns - position[1]:
+                return False
+        else:
+            raise ValueError
+        return not any(cell in self.cellShips for cell in self.shipCells(position, length, heading))
+
+    def randomBoatPlacement(self):
+        # Rejection sampling, PlacementIndex would enumerate every placement on the board.
+        # Same distribution as PlacementIndex.sampleFleet as long as it doesn't have to give up.
+        layout = []
+        for i, length in enumerate(self.shipLengths):
+            for attempt in range(SparsePlayerBoard.MAX_PLACEMENT_ATTEMPTS):
+                heading = 'vertical' if self.rng.random() < .5 else 'horizontal'
+                position = (self.rng.randint(0, self.rows - 1), self.rng.randint(0, self.columns - 1))
+                if self.isValidPlacement(position, length, heading):
+                    break
+            else:
+                raise ValueError('could not place fleet %s on a %sx%s board' % (self.shipLengths, self.rows, self.columns))
+            self.placeShip(position, length, heading, i + 1)
+            layout.append((position, heading))
+        self.layout = layout
+
+    def placeShip(self, position, length, heading, type):
+        if self.isValidPlacement(position, length, heading):
+            for cell in self.shipCells(position, length, heading):
+                self.cellShips[cell] = type - 1
+
+    def isValidShot(self, position):
+        if not (0 <= position[0] < self.rows and 0 <= position[1] < self.columns):
+            return False
+        return (position[0], position[1]) not in self.shots
+
+    def markShot(self, position):
+        cell = (position[0], position[1])
+        self.shots.add(cell)
+        shipIndex = self.cellShips.get(cell)
+        if shipIndex is not None:
+            self.hits.add(cell)
+        return shipIndex
+
+    def getValidShotMask(self):
+        mask = np.ones([self.rows * self.columns,], dtype=bool)
+        for cell in self.shots:
+            mask[cell[0] * self.columns + cell[1]] = False
+        return mask
+
+    # Dense views with the same values as PlayerBoard.grid and PlayerBoard.opponentView, built on
+    # demand (for getGameState and the displays), so only use them on boards small enough for that
+    @property
+    def grid(self):
+        grid = np.zeros([self.rows, self.columns], dtype=int)
+        for cell, shipIndex in self.cellShips.items():
+            grid[cell] = shipIndex + 1
+        for cell in self.shots:
+            grid[cell] = -grid[cell] if grid[cell] else -(self.numShips+1) #+1 to avoid conflict with boat indices
+        return grid
+
+    @property
+    def opponentView(self):
+        opponentView = np.zeros([self.rows, self.columns], dtype=float)
+        for cell in self.shots:
+            opponentView[cell] = 1 if cell in self.hits else -1
+        return opponentView
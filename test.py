@@ -1,13 +1,50 @@
 import json
-import matplotlib.pyplot as plt
+import argparse
 import numpy as np
 
 from game import GameBatch
+from batchStats import JsonlSink, CsvSink
+from gameRecord import GameRecordWriter
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a batch of games.')
+    parser.add_argument('--games', type=int, default=100, help='number of games in the batch (the most played when stopping early)')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to spread the games across')
+    parser.add_argument('--seed', type=int, default=None, help='seed for a reproducible batch')
+    parser.add_argument('--backend', type=str, default='serial', choices=GameBatch.BACKENDS, help='')
+    parser.add_argument('--jsonl', type=str, default=None, help='append each game report to this JSONL file')
+    parser.add_argument('--csv', type=str, default=None, help='append each game report to this CSV file')
+    parser.add_argument('--moves-half-width', type=float, default=None,
+                            help='stop once the mean moves 95%% confidence interval is narrower than this')
+    parser.add_argument('--win-rate-half-width', type=float, default=None,
+                            help='stop once the player 1 win rate 95%% confidence interval is narrower than this')
+    parser.add_argument('--record', type=str, default=None, help='append a binary record of each game to this file (see gameRecord.py)')
+    parser.add_argument('--instrument', action='store_true', help='time each phase of the games and print a summary table')
 
-    testBatch = GameBatch(2, ['AI', 'RANDOM'], 100, 8, 8, [2,3,3,4,5], False)
-    testBatch.playGames()
+    args = parser.parse_args()
+
+    testBatch = GameBatch(2, ['AI', 'RANDOM'], args.games, 8, 8, [2,3,3,4,5], False,
+                            backend=args.backend, workers=args.workers, seed=args.seed, instrument=args.instrument,
+                            record=args.record is not None)
+
+    sinks = []
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.csv:
+        sinks.append(CsvSink(args.csv))
+    if args.record:
+        sinks.append(GameRecordWriter(args.record))
+
+    if sinks or args.instrument or args.moves_half_width is not None or args.win_rate_half_width is not None:
+        # Streaming run, nothing is kept in memory but the running statistics
+        stats = testBatch.runGames(sinks, meanMovesHalfWidth=args.moves_half_width, winRateHalfWidth=args.win_rate_half_width)
+        for sink in sinks:
+            sink.close()
+        print(json.dumps(stats.summary(), indent=2))
+        if stats.instrumentation is not None:
+            print(stats.instrumentation.table())
+    else:
+        testBatch.playGames()
 
     # testBatch2 = GameBatch(1, ['AI'], 200, 8, 8, [2,3,3,4,5], False)
     # testBatch2.playGames()
@@ -0,0 +1,30 @@
+import math
+import unittest
+
+from batchStats import BatchStats
+
+def statsFor(winners):
+    stats = BatchStats(['AI', 'RANDOM'])
+    for winner in winners:
+        stats.add({'winnerPlayerNum': winner, 'winnerNumMoves': 50})
+    return stats
+
+class WinRateHalfWidthTest(unittest.TestCase):
+    def testUnanimousSmallSample(self):
+        #a Wald interval would be 0 here, the Wilson one is about z^2 / 2 / (n + z^2)
+        stats = statsFor([1] * 30)
+        self.assertEqual(stats.winRate(1), 1.0)
+        self.assertAlmostEqual(stats.winRateHalfWidth(1), 1.96 ** 2 / 2 / (30 + 1.96 ** 2), places=3)
+        self.assertGreater(stats.winRateHalfWidth(1), .05)
+        self.assertFalse(stats.isConfident(winRateHalfWidth=.03))
+        self.assertGreater(statsFor([2] * 30).winRateHalfWidth(1), .05)
+
+    def testNarrowsWithMoreGames(self):
+        self.assertTrue(statsFor([1] * 100).isConfident(winRateHalfWidth=.03))
+        self.assertLess(statsFor([1, 2] * 500).winRateHalfWidth(1), statsFor([1, 2] * 50).winRateHalfWidth(1))
+
+    def testTooFewGames(self):
+        self.assertEqual(statsFor([1]).winRateHalfWidth(1), math.inf)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from game import Game, PlayerBoard
+
+BACKENDS = ['dense', 'bitboard', 'sparse']
+
+def boardState(playerBoard):
+    return (playerBoard.score, playerBoard.moves, playerBoard.lifeCount, playerBoard.grid.tolist(), playerBoard.opponentView.tolist(),
+            playerBoard.shipsSunk.tolist(), playerBoard.ships.tolist())
+
+def playSeededGame(boardBackend, seed):
+    game = Game(2, ['AI', 'RANDOM'], 10, 10, [2,3,3,4,5], False, seed=seed, boardBackend=boardBackend, record=True)
+    gameReport = game.playGame()
+    return gameReport, [(list(playerBoard.shotLog), boardState(playerBoard)) for playerBoard in game.getPlayerBoards()]
+
+class BoardBackendTest(unittest.TestCase):
+    def testBitboardPlaysTheSameGames(self):
+        for seed in range(10):
+            self.assertEqual(playSeededGame('bitboard', seed), playSeededGame('dense', seed), 'seed %s' % seed)
+
+    def testSparseMatchesDenseReplay(self):
+        #the sparse board places its fleet differently, so replay its shots on a dense board with the same layout
+        for seed in range(10):
+            game = Game(2, ['AI', 'RANDOM'], 10, 10, [2,3,3,4,5], False, seed=seed, boardBackend='sparse', record=True)
+            game.playGame()
+            for playerBoard in game.getPlayerBoards():
+                dense = PlayerBoard(10, 10, None, [2,3,3,4,5], False, layout=playerBoard.layout)
+                for cell in playerBoard.shotLog:
+                    dense.shoot((cell // 10, cell % 10))
+                self.assertEqual(boardState(playerBoard), boardState(dense), 'seed %s' % seed)
+
+    def testShootAndReset(self):
+        for boardBackend in BACKENDS:
+            game = Game(1, ['RANDOM'], 4, 4, [2], False, seed=1, boardBackend=boardBackend)
+            playerBoard = game.getPlayerBoards()[0]
+            sunk = []
+            playerBoard.subscribe('shipSunk', lambda board, shipIndex: sunk.append(shipIndex))
+            (row, col), heading = playerBoard.layout[0]
+            other = (row + 1, col) if heading == 'horizontal' else (row, col + 1)
+            other = (other[0] % 4, other[1] % 4)
+            self.assertFalse(playerBoard.shoot(other))
+            self.assertFalse(playerBoard.shoot(other)) #repeat shot
+            self.assertEqual(playerBoard.score, -2)
+            self.assertTrue(playerBoard.shoot((row, col)))
+            self.assertTrue(playerBoard.shoot((row + 1, col) if heading == 'vertical' else (row, col + 1)))
+            self.assertEqual((playerBoard.sunkShip, sunk, playerBoard.lifeCount), (0, [0], 0))
+            self.assertTrue(playerBoard.isGameOver())
+            game.reset()
+            self.assertEqual((playerBoard.score, playerBoard.moves, playerBoard.lifeCount), (0, 0, 2))
+            self.assertEqual(playerBoard.opponentView.tolist(), [[0] * 4] * 4)
+            self.assertEqual(int((playerBoard.grid != 0).sum()), 2, boardBackend)
+
+if __name__ == '__main__':
+    unittest.main()
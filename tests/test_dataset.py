@@ -0,0 +1,43 @@
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+
+from dataset import buildDataset, iterBatches, shardFiles
+from game import Game, gameSeed
+
+class DatasetTest(unittest.TestCase):
+    def testShardsRoundTrip(self):
+        path = tempfile.mkdtemp()
+        numPositions = buildDataset(path, 5, gamesPerShard=2, playerType='RANDOM', seed=1)
+        with open(os.path.join(path, 'index.json')) as infile:
+            index = json.load(infile)
+        self.assertEqual(len(index['shards']), 3)
+        self.assertEqual(sum(shard['positions'] for shard in index['shards']), numPositions)
+
+        #the first shard holds every position of its two games, in order
+        observationFile, occupancyFile = shardFiles(path, 0)
+        observations = np.load(observationFile, mmap_mode='r')
+        occupancy = np.load(occupancyFile, mmap_mode='r')
+        self.assertIsInstance(observations, np.memmap)
+        row = 0
+        for i in range(2):
+            game = Game(1, ['RANDOM'], 8, 8, [2,3,3,4,5], False, seed=gameSeed(1, 'shard0:%s' % i))
+            gameEnd = False
+            while not gameEnd:
+                self.assertTrue(np.array_equal(observations[row], game.board.getGameState()[0]))
+                self.assertTrue(np.array_equal(occupancy[row], game.board.getOccupancy()[0]))
+                row += 1
+                gameEnd = game.board.executeTurn()
+        self.assertEqual(row, index['shards'][0]['positions'])
+
+        #every position comes out of iterBatches once per epoch
+        batches = list(iterBatches(path, batchSize=16, seed=0))
+        self.assertTrue(all(len(batch[0]) <= 16 and batch[0].dtype == np.float32 for batch in batches))
+        stored = np.concatenate([np.load(shardFiles(path, shard['shard'])[0]) for shard in index['shards']])
+        read = np.concatenate([batch[0] for batch in batches])
+        self.assertEqual(sorted(map(tuple, read)), sorted(map(tuple, stored.astype(np.float32))))
+
+if __name__ == '__main__':
+    unittest.main()
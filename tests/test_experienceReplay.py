@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+
+from ai import ExperienceReplay
+
+class LinearModel:
+    # Stands in for the keras model: Q values are a fixed linear function of the state
+    def __init__(self, numInputs, numActions):
+        self.weights = np.arange(numInputs * numActions, dtype=float).reshape(numInputs, numActions) / 10
+
+    def predict(self, states):
+        return np.dot(states, self.weights)
+
+def transition(i):
+    #state i is [i, i + .5], action i % 3, reward i
+    return [np.array([[i, i + .5]]), i % 3, float(i), np.array([[i + 1, i + 1.5]])]
+
+class ExperienceReplayTest(unittest.TestCase):
+    def testWrapsAround(self):
+        replay = ExperienceReplay(max_memory=4)
+        for i in range(6):
+            replay.remember(transition(i), i % 2 == 1)
+        self.assertEqual(len(replay), 4)
+        self.assertEqual(replay.next_idx, 2)
+        #transitions 4 and 5 overwrote the two oldest, 0 and 1
+        self.assertEqual(sorted(replay.rewards), [2, 3, 4, 5])
+        self.assertEqual(list(replay.states_t[:2, 0]), [4, 5])
+        self.assertEqual(list(replay.game_overs), [False, True, False, True])
+
+    def testTargets(self):
+        model = LinearModel(2, 3)
+        replay = ExperienceReplay(max_memory=10, discount=.9)
+        for i in range(5):
+            replay.remember(transition(i), i == 2)
+        np.random.seed(0)
+        inputs, targets = replay.get_batch(model, batch_size=50) #as many samples as there are transitions
+        self.assertEqual(len(inputs), 5)
+        for state, target in zip(inputs, targets):
+            i = int(state[0])
+            expected = model.predict(state[None, :])[0]
+            #only the action taken gets a new target, r + discount * max Q(s') unless the game ended
+            expected[i % 3] = i + (0 if i == 2 else .9 * model.predict(np.array([[i + 1, i + 1.5]])).max())
+            self.assertTrue(np.allclose(target, expected), (i, target, expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from game import Game
+from gameRecord import GameRecord, GameRecordReader, GameRecordWriter
+
+class GameRecordTest(unittest.TestCase):
+    def roundTrip(self, game):
+        gameReport = game.playGame()
+        record = GameRecord(gameReport['record'])
+        self.assertEqual(record.winnerPlayerNum, gameReport['winnerPlayerNum'])
+        for playerBoard, layout, shots in zip(game.getPlayerBoards(), record.layouts, record.shots):
+            self.assertEqual([(tuple(position), heading) for position, heading in playerBoard.layout], layout)
+            self.assertEqual(list(playerBoard.shotLog), [int(cell) for cell in shots])
+        return record
+
+    def testReplaySmallBoard(self):
+        game = Game(2, ['AI', 'RANDOM'], 8, 8, [2,3,3,4,5], False, seed=1, record=True)
+        record = self.roundTrip(game)
+        for original, replayed in zip(game.getPlayerBoards(), record.replay()):
+            self.assertTrue((original.grid == replayed.grid).all())
+
+    def testLargeSparseBoard(self):
+        #more than 65536 cells, and ship lengths over 255
+        game = Game(1, ['SPARSE'], 300, 300, [2,3,300], False, seed=1, boardBackend='sparse', record=True)
+        record = self.roundTrip(game)
+        self.assertEqual(record.ships, [2,3,300])
+        self.assertEqual(record.shots[0].dtype, np.dtype('<u4'))
+
+    def testUnrecordableBoardRaisesBeforePlaying(self):
+        with self.assertRaises(ValueError):
+            Game(1, ['SPARSE'], 70000, 10, [2], False, boardBackend='sparse', record=True)
+
+    def testFileRoundTrip(self):
+        path = os.path.join(tempfile.mkdtemp(), 'games.rec')
+        writer = GameRecordWriter(path)
+        gameReports = [Game(2, ['AI', 'RANDOM'], 8, 8, [2,3,3,4,5], False, seed=seed, record=True).playGame() for seed in range(3)]
+        for gameReport in gameReports:
+            writer.write(gameReport)
+        writer.close()
+        reader = GameRecordReader(path)
+        self.assertEqual(len(reader), 3)
+        self.assertEqual([record.winnerPlayerNum for record in reader], [gameReport['winnerPlayerNum'] for gameReport in gameReports])
+        reader.close()
+
+    def testRejectsOtherFiles(self):
+        path = os.path.join(tempfile.mkdtemp(), 'other.rec')
+        with open(path, 'wb') as outfile:
+            outfile.write(b'BSGR\x02' + bytes(16))
+        with self.assertRaises(ValueError):
+            GameRecordReader(path)
+        with self.assertRaises(ValueError):
+            GameRecordWriter(path) #appending would corrupt it
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import subprocess
+import unittest
+
+# The game engine and AIs stay importable with just numpy and the standard library, and
+# importing them stays fast. Each module is imported in a fresh interpreter so nothing is
+# already cached.
+
+HEADLESS_MODULES = [
+    'game',
+    'ruleBasedAI',
+    'probabilityAI',
+    'placement',
+    'events',
+    'bitBoard',
+    'vectorizedGame',
+    'vectorEnv',
+    'ai',
+    'instrumentation',
+    'gameRecord',
+    'openingBook',
+    'server',
+    'sparseBoard',
+    'sparseAI',
+    'neuralAI',
+    'dataset',
+    'tuneRuleAI',
+]
+HEAVY_MODULES = ['matplotlib', 'keras', 'tensorflow']
+BUDGET = .5 #seconds to import each module
+
+CHECK_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import %s
+elapsed = time.perf_counter() - start
+heavy = [name for name in %r if name in sys.modules]
+print(elapsed, ','.join(heavy))
+'''
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def checkImport(module):
+    output = subprocess.check_output([sys.executable, '-c', CHECK_SCRIPT % (module, HEAVY_MODULES)],
+                                        cwd=REPO, universal_newlines=True)
+    fields = output.strip().split(' ')
+    return float(fields[0]), fields[1] if len(fields) > 1 else ''
+
+class ImportBudgetTest(unittest.TestCase):
+    def testHeadlessModules(self):
+        for module in HEADLESS_MODULES:
+            with self.subTest(module=module):
+                elapsed, heavy = checkImport(module)
+                self.assertEqual(heavy, '', '%s imports %s' % (module, heavy))
+                self.assertLess(elapsed, BUDGET, '%s took %.3fs' % (module, elapsed))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from game import Game
+from neuralAI import DenseNetwork, saveWeights
+from ruleBasedAI import registerAIConfig
+
+def randomWeights(randomState, sizes):
+    weights = []
+    for numInputs, numOutputs in zip(sizes[:-1], sizes[1:]):
+        weights += [randomState.randn(numInputs, numOutputs), randomState.randn(numOutputs)]
+    return weights
+
+class DenseNetworkTest(unittest.TestCase):
+    def testBestMovesSkipsPlayedCells(self):
+        randomState = np.random.RandomState(0)
+        weights = randomWeights(randomState, [64, 32, 64])
+        weights[-1][:8] += 1000 #the first row always has the highest Q values
+        network = DenseNetwork(weights)
+        states = randomState.choice([-1, 0, 1], size=(200, 64), p=[.3, .4, .3]).astype(float)
+        states[:, :8] = randomState.choice([-1, 1], size=(200, 8))
+        states[0, :] = -1
+        states[0, 63] = 0 #a single cell left
+        q = network.forward(states)
+        moves = network.bestMoves(states)
+        for state, qValues, move in zip(states, q, moves):
+            self.assertEqual(state[move], 0)
+            self.assertEqual(qValues[move], qValues[state == 0].max())
+        self.assertEqual(moves[0], 63)
+
+    def testNeuralPlayerNeverRepeatsAShot(self):
+        path = os.path.join(tempfile.mkdtemp(), 'model.npz')
+        weights = randomWeights(np.random.RandomState(1), [64, 16, 64])
+        weights[-1][:] += np.arange(64) * 100 #prefers the same few cells whatever the board
+        saveWeights(weights, path)
+        registerAIConfig('NNTEST', {'strategy': 'neural', 'model': path})
+        game = Game(1, ['NNTEST'], 8, 8, [2,3,3,4,5], False, seed=1)
+        board = game.board
+        ai = board.player.ai
+        #turns played by hand, a repeated shot would make executeTurn ask again forever
+        for turn in range(64):
+            move = ai.getNextMove()
+            self.assertTrue(board.isValidShot(move), 'turn %s repeats %s' % (turn, move))
+            board.shoot(move)
+            ai.postExecution(move, board.reward == board.HIT_VALUE)
+            if board.lifeCount == 0:
+                break
+        self.assertEqual(board.lifeCount, 0)
+
+if __name__ == '__main__':
+    unittest.main()
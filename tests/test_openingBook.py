@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+import numpy as np
+
+from game import Game
+from openingBook import buildOpeningBook
+from placement import PlacementIndex
+from ruleBasedAI import registerAIConfig
+
+SHIPS = [2,3,3,4,5]
+
+def recount(rows, columns, ships, boardState):
+    #placements of ships crossing no played cell, counted from scratch
+    index = PlacementIndex.get(rows, columns)
+    played = (boardState != 0).ravel()
+    scores = np.zeros([rows * columns,], dtype=float)
+    for length in ships:
+        cells = index.getPlacementCells(length)
+        scores += np.bincount(cells[~played[cells].any(axis=1)].ravel(), minlength=rows * columns)
+    return scores
+
+class OpeningBookTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        path = tempfile.mkdtemp()
+        buildOpeningBook(path, 8, 8, SHIPS)
+        registerAIConfig('BOOKTEST', {'openingBook': path})
+
+    def testBookMovesAreUnplayedAndConditionedOnShots(self):
+        bookMoves = []
+        for seed in range(20):
+            game = Game(2, ['BOOKTEST', 'RANDOM'], 8, 8, SHIPS, False, seed=seed)
+            ai = game.getPlayerBoards()[0].player.ai
+            getBookMove = ai.getBookMove
+            def checkedBookMove():
+                scores = ai.crossedPlacements.scores(ai.openingBook, ai.shipsAfloat)
+                self.assertTrue(np.array_equal(scores, recount(8, 8, ai.shipsAfloat, ai.boardState)))
+                move = getBookMove()
+                self.assertEqual(ai.boardState[move[0], move[1]], 0)
+                bookMoves.append(move)
+                return move
+            ai.getBookMove = checkedBookMove
+            game.playGame()
+        self.assertGreater(len(bookMoves), 20)
+
+    def testEveryUnplayedCellCanBeDrawnOnceNothingFits(self):
+        #with no placement left the draw falls back to any unplayed cell
+        game = Game(1, ['BOOKTEST'], 8, 8, SHIPS, False, seed=1)
+        ai = game.getPlayerBoards()[0].player.ai
+        for row in range(8):
+            for col in range(8):
+                if (row, col) != (3, 3):
+                    ai.postExecution([row, col, 0], False)
+        self.assertEqual(ai.getBookMove()[:2], [3, 3])
+
+if __name__ == '__main__':
+    unittest.main()
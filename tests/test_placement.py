@@ -0,0 +1,50 @@
+import random
+import time
+import unittest
+
+from placement import PlacementIndex
+from game import Game
+from vectorizedGame import BatchedGame
+
+def shipCellsOf(index, layout, ships):
+    return [set(index.shipCells(position, length, heading)) for (position, heading), length in zip(layout, ships)]
+
+class PlacementIndexTest(unittest.TestCase):
+    def testLayoutIsLegal(self):
+        ships = [2,3,3,4,5]
+        index = PlacementIndex.get(8, 8)
+        rng = random.Random(1)
+        for i in range(200):
+            layout = index.sampleFleet(ships, rng)
+            cells = shipCellsOf(index, layout, ships)
+            self.assertEqual(len(set().union(*cells)), sum(ships))
+            for (position, heading), length in zip(layout, ships):
+                self.assertIn((position, heading), index.getPlacements(length))
+
+    def testDenseFleetBacktracks(self):
+        #leaves one cell free on a 5x5 board, random draws alone rarely place the last ships
+        ships = [5,5,4,4,3,2]
+        index = PlacementIndex.get(5, 5)
+        layout = index.sampleFleet(ships, random.Random(3))
+        self.assertEqual(len(set().union(*shipCellsOf(index, layout, ships))), sum(ships))
+
+    def testDenseInfeasibleFleetRaises(self):
+        # Passes checkFleet (24 of 25 cells, every ship fits on its own) but three 5s fill three
+        # rows (or columns), and a 4 and two 3s don't fit in the other two
+        start = time.time()
+        with self.assertRaises(ValueError):
+            PlacementIndex.get(5, 5).sampleFleet([5,5,5,4,3,3], random.Random(0))
+        with self.assertRaises(ValueError):
+            PlacementIndex.get(5, 5).sampleFleet([3,3,4,5,5,5], random.Random(0))
+        self.assertLess(time.time() - start, 10)
+
+    def testOversizedFleetRaises(self):
+        with self.assertRaises(ValueError):
+            Game(1, ['RANDOM'], 2, 2, [3], False)
+        with self.assertRaises(ValueError):
+            BatchedGame(1, ['RANDOM'], 2, 2, 2, [3])
+        with self.assertRaises(ValueError):
+            BatchedGame(1, ['RANDOM'], 2, 5, 5, [5,5,5,4,3,3])
+
+if __name__ == '__main__':
+    unittest.main()
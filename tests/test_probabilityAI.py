@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+
+from game import Game
+
+def recount(ai):
+    # density and hitDensity counted from scratch: the live placements are the ones crossing
+    # no cell that was shot and isn't an unresolved hit (misses and the cells of sunk ships)
+    dead = ai.shot.copy()
+    dead[list(ai.unresolvedHits)] = False
+    hits = np.zeros([ai.rows * ai.columns,], dtype=int)
+    hits[list(ai.unresolvedHits)] = 1
+    density = {}
+    hitDensity = {}
+    for length, cells in ai.cells.items():
+        alive = ~dead[cells].any(axis=1)
+        hitsCovered = hits[cells].sum(axis=1)
+        density[length] = np.bincount(cells[alive].ravel(), minlength=ai.rows * ai.columns)
+        hitDensity[length] = np.bincount(cells[alive].ravel(), weights=np.repeat(hitsCovered[alive], length), minlength=ai.rows * ai.columns)
+    return density, hitDensity
+
+class ProbabilityAITest(unittest.TestCase):
+    def testIncrementalCountsMatchRecount(self):
+        sinks = 0
+        for seed in range(5):
+            game = Game(1, ['PROB'], 8, 8, [2,3,3,4,5], False, seed=seed)
+            ai = game.board.player.ai
+            gameEnd = False
+            while not gameEnd:
+                gameEnd = game.board.executeTurn()
+                sinks += game.board.sunkShip is not None
+                density, hitDensity = recount(ai)
+                for length in ai.cells:
+                    self.assertTrue(np.array_equal(ai.density[length], density[length]))
+                    self.assertTrue(np.array_equal(ai.hitDensity[length], hitDensity[length]))
+            self.assertEqual(sum(ai.remaining.values()), 0)
+            self.assertEqual(ai.unresolvedHits, set()) #every hit was put down to a sunk ship
+        self.assertEqual(sinks, 25)
+
+    def testResetMatchesNewAI(self):
+        game = Game(1, ['PROB'], 8, 8, [2,3,3,4,5], False, seed=1)
+        game.playGame()
+        ai = game.board.player.ai
+        ai.reset()
+        fresh = Game(1, ['PROB'], 8, 8, [2,3,3,4,5], False, seed=1).board.player.ai
+        for length in ai.cells:
+            self.assertTrue(np.array_equal(ai.density[length], fresh.density[length]))
+            self.assertTrue(np.array_equal(ai.hitDensity[length], fresh.hitDensity[length]))
+            self.assertTrue(np.array_equal(ai.alive[length], fresh.alive[length]))
+
+if __name__ == '__main__':
+    unittest.main()
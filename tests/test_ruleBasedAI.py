@@ -0,0 +1,92 @@
+import random
+import unittest
+
+from game import Game
+from ruleBasedAI import UnplayedCells, registerAIConfig
+
+# The move list RuleAI used before MoveQueue: every queued move is rescored with the tier
+# functions on every turn and the first maximum is popped (np.argmax). The list kept
+# duplicate cells and left them queued after the cell was shot, MoveQueue coalesces them,
+# so a shot cell is removed from the list here as well.
+class ArgmaxQueue(list):
+    def push(self, move, front=True):
+        if front:
+            self.insert(0, move)
+        else:
+            self.append(move)
+
+    def discard(self, cell):
+        self[:] = [move for move in self if (move[0], move[1]) != cell]
+
+    def markDirty(self, cells):
+        return
+
+    def popBest(self, evaluateMove):
+        scores = [evaluateMove(move) for move in self]
+        return self.pop(scores.index(max(scores)))
+
+def tierScore(ai):
+    return lambda move: ai.evaluateFirstTier(move) + ai.evaluateSecondTier(move) + ai.evaluateBothTiers(move)
+
+def playSeededGame(playerTypes, seed, argmax):
+    game = Game(2, playerTypes, 10, 10, [2,3,3,4,5], False, seed=seed, record=True)
+    if argmax:
+        for playerBoard in game.getPlayerBoards():
+            ai = playerBoard.player.ai
+            ai.moveQueue = ArgmaxQueue()
+            ai.evaluateMove = tierScore(ai)
+    game.playGame()
+    return [list(playerBoard.shotLog) for playerBoard in game.getPlayerBoards()]
+
+class MoveSelectionTest(unittest.TestCase):
+    def assertSameMoves(self, playerTypes, numGames=50):
+        for i in range(numGames):
+            self.assertEqual(playSeededGame(playerTypes, i, False), playSeededGame(playerTypes, i, True), 'seed %s' % i)
+
+    def testMatchesArgmaxOverList(self):
+        self.assertSameMoves(['AI', 'AI'])
+
+    def testMatchesArgmaxOverListLazy(self):
+        registerAIConfig('LAZYTEST', {'queueIndex': 'lazy', 'epsilon': .2})
+        self.assertSameMoves(['LAZYTEST', 'AI'])
+
+    def testScoreMapMatchesTierFunctions(self):
+        game = Game(2, ['AI', 'AI'], 10, 10, [2,3,3,4,5], False, seed=1)
+        ai = game.getPlayerBoards()[0].player.ai
+        evaluate = tierScore(ai)
+        gameEnd = False
+        while not gameEnd:
+            gameEnd = game.board.executeTurn()
+            if ai.scoreMap is not None:
+                for row in range(10):
+                    for col in range(10):
+                        self.assertAlmostEqual(ai.scoreMap[row, col], evaluate([row, col]))
+
+class UnplayedCellsTest(unittest.TestCase):
+    def testDrawsEveryCellOnce(self):
+        unplayed = UnplayedCells(5, 7)
+        rng = random.Random(0)
+        drawn = []
+        while len(unplayed):
+            cell = unplayed.sample(rng)
+            self.assertNotIn(cell, drawn)
+            drawn.append(cell)
+            unplayed.discard(cell)
+            unplayed.discard(cell) #discarding a played cell again changes nothing
+            self.assertEqual(len(unplayed), 35 - len(drawn))
+        self.assertEqual(sorted(drawn), [[row, col] for row in range(5) for col in range(7)])
+
+    def testDiscardedCellsAreNeverSampled(self):
+        unplayed = UnplayedCells(4, 4)
+        rng = random.Random(1)
+        for position in [[0, 0], [3, 3], [1, 2], [0, 0]]:
+            unplayed.discard(position)
+        self.assertEqual(len(unplayed), 13)
+        remaining = set((cell // 4, cell % 4) for cell in unplayed.cells[:len(unplayed)])
+        self.assertEqual(remaining, set((row, col) for row in range(4) for col in range(4)) - {(0, 0), (3, 3), (1, 2)})
+        self.assertFalse(any(tuple(unplayed.sample(rng)) in {(0, 0), (3, 3), (1, 2)} for i in range(500)))
+        unplayed.reset()
+        self.assertEqual((len(unplayed), unplayed.cells), (16, list(range(16))))
+
+if __name__ == '__main__':
+    unittest.main()
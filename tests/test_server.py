@@ -0,0 +1,88 @@
+import os
+import asyncio
+import tempfile
+import unittest
+
+from ruleBasedAI import registerAIConfig
+from server import GameServer
+
+async def readUntil(reader, isLast):
+    lines = []
+    while True:
+        line = (await asyncio.wait_for(reader.readline(), 10)).decode().strip()
+        lines.append(line)
+        if isLast(line):
+            return lines
+
+async def command(reader, writer, line):
+    # Lines sent back for a command. A shot's results are a variable number of lines, so
+    # each shot is followed by a VIEW, which ends with END (or ERR once the game is over).
+    writer.write((line + '\nVIEW\n').encode())
+    await writer.drain()
+    lines = await readUntil(reader, lambda line: line == 'END' or line.startswith('ERR'))
+    return lines[:lines.index('TARGET')] if 'TARGET' in lines else lines
+
+class GameServerTest(unittest.IsolatedAsyncioTestCase):
+    async def playGame(self, reader, writer):
+        writer.write(b'NEW AI 1\n')
+        await writer.drain()
+        self.assertEqual(await readUntil(reader, lambda line: True), ['OK 8 8 2 3 3 4 5'])
+        results = []
+        for cell in range(64):
+            lines = await command(reader, writer, 'SHOT %s %s' % (cell // 8, cell % 8))
+            self.assertTrue(lines[0].startswith('HIT') or lines[0].startswith('MISS'), lines)
+            results.extend(lines)
+            if any(line.split()[0] in ['WIN', 'LOSE'] for line in lines):
+                break
+        else:
+            self.fail('no WIN or LOSE after shooting every cell')
+        #whoever won sank the whole fleet
+        sunkPrefix = 'SUNK' if any(line.startswith('WIN') for line in results) else 'OPPONENT SUNK'
+        self.assertEqual(sum(line.startswith(sunkPrefix) for line in results), 5)
+        #malformed lines get an ERR and the connection stays usable
+        writer.write(b'SHOT x y\nBOGUS\n')
+        await writer.drain()
+        self.assertTrue((await readUntil(reader, lambda line: True))[0].startswith('ERR'))
+        self.assertTrue((await readUntil(reader, lambda line: True))[0].startswith('ERR unknown command'))
+        writer.write(b'QUIT\n')
+        await writer.drain()
+        self.assertEqual(await readUntil(reader, lambda line: True), ['BYE'])
+        writer.close()
+
+    async def testTcpGame(self):
+        server = await GameServer().start(port=0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await self.playGame(reader, writer)
+
+    async def testUnixSocketGameWithExecutor(self):
+        path = os.path.join(tempfile.mkdtemp(), 'server.sock')
+        server = await GameServer(executorThreads=2).start(path=path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await self.playGame(reader, writer)
+
+    async def testNewWithUnplayableAI(self):
+        registerAIConfig('UNTRAINED', {'strategy': 'neural', 'model': os.path.join(tempfile.mkdtemp(), 'missing.npz')})
+        registerAIConfig('NOSTRATEGY', {'strategy': 'telepathy'})
+        server = await GameServer().start(port=0)
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+            for playerType in ['UNTRAINED', 'NOSTRATEGY', 'NOSUCHSECTION']:
+                writer.write(('NEW %s\n' % playerType).encode())
+                await writer.drain()
+                self.assertTrue((await readUntil(reader, lambda line: True))[0].startswith('ERR'))
+            #the connection is still usable
+            await self.playGame(reader, writer)
+
+    async def testIdleTimeout(self):
+        server = await GameServer(timeout=.2).start(port=0)
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+            self.assertEqual(await readUntil(reader, lambda line: True), ['TIMEOUT'])
+            self.assertEqual(await reader.read(), b'') #closed by the server
+            writer.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+
+import tournament
+from game import Game
+
+class RecordingGame(Game):
+    # Game that keeps the layouts each of its games was played on
+    layouts = []
+
+    def playGame(self):
+        RecordingGame.layouts.append(sorted(tuple(playerBoard.layout) for playerBoard in self.getPlayerBoards()))
+        return Game.playGame(self)
+
+class TournamentTest(unittest.TestCase):
+    def testSeatingsShareBoardsWithoutASeed(self):
+        tournamentWithoutSeed = tournament.Tournament(['AI', 'RANDOM'], maxGames=6)
+        self.assertIsNotNone(tournamentWithoutSeed.seed)
+        RecordingGame.layouts = []
+        with mock.patch.object(tournament, 'Game', RecordingGame):
+            pairing = next(tournamentWithoutSeed.iterPairings())
+        self.assertEqual(len(RecordingGame.layouts), len(pairing['winners']))
+        #each pair of games is played on the same two boards, with the players swapped
+        for pairNum in range(len(RecordingGame.layouts) // 2):
+            self.assertEqual(RecordingGame.layouts[2 * pairNum], RecordingGame.layouts[2 * pairNum + 1])
+        self.assertNotEqual(RecordingGame.layouts[0], RecordingGame.layouts[2])
+
+    def testPairingNeedsASeed(self):
+        with self.assertRaises(ValueError):
+            tournament.playPairing(('AI', 'RANDOM', 8, 8, [2,3,3,4,5], 'dense', None, 10, .05, .05, .05))
+
+if __name__ == '__main__':
+    unittest.main()
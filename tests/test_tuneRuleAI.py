@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import tuneRuleAI
+from game import Game
+
+class RecordingGame(Game):
+    # Game that keeps the layout of each game it plays, per player type
+    layouts = {}
+
+    def playGame(self):
+        RecordingGame.layouts.setdefault(self.board.player.playerType, []).append(self.board.layout)
+        return Game.playGame(self)
+
+class TunerTest(unittest.TestCase):
+    def testCandidatesPlayTheSameGames(self):
+        tuner = tuneRuleAI.Tuner(['epsilon', 'queueIndex'], seed=3, chunkSize=4)
+        candidateNums = tuner.randomCandidates(2)
+        RecordingGame.layouts = {}
+        with mock.patch.object(tuneRuleAI, 'Game', RecordingGame):
+            tuner.evaluate(candidateNums, 10)
+        layouts = [RecordingGame.layouts[tuneRuleAI.candidateName(candidateNum)] for candidateNum in [0] + candidateNums]
+        self.assertEqual(len(layouts[0]), 10)
+        #common random numbers: game i has the same fleet for every candidate, the base included
+        for candidateLayouts in layouts[1:]:
+            self.assertEqual(candidateLayouts, layouts[0])
+        self.assertNotEqual(layouts[0][0], layouts[0][1])
+
+    def testOnlyAWinnerThatBeatsTheBaseIsWritten(self):
+        tuner = tuneRuleAI.Tuner(['epsilon'], seed=0)
+        better, noisy = tuner.gridCandidates()[:2]
+        tuner.moves[0] = [50, 52, 48, 51, 49, 50]
+        tuner.moves[better] = [45, 48, 44, 45, 46, 44] #about 5 moves fewer in every game
+        tuner.moves[noisy] = [40, 60, 40, 60, 40, 58] #fewer on average, but not beyond the noise
+        self.assertEqual(tuner.winner([better, noisy]), tuner.candidates[better])
+        self.assertIsNone(tuner.winner([noisy, better]))
+        self.assertIsNone(tuner.winner([]))
+        self.assertIsNone(tuner.winner([0])) #the base never beats itself
+
+        path = os.path.join(tempfile.mkdtemp(), 'tuned.ini')
+        tuneRuleAI.writeSection(path, 'TUNED', tuner.winner([better]))
+        self.assertEqual(tuneRuleAI.sectionItems('TUNED', path), tuner.candidates[better])
+        with self.assertRaises(ValueError):
+            tuneRuleAI.writeSection(path, 'TUNED', tuner.candidates[better])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import os
+import json
+import math
+import random
+import logging
+import argparse
+import itertools
+import configparser
+
+from game import Game, gameSeed
+
+logger = logging.getLogger(__name__)
+
+# Round robin between AI player types (config.ini sections).
+#
+# Every pairing is played in pairs of games on the same seeds with the players swapped,
+# since Board always lets player 1 move first. A pairing stops as soon as a sequential
+# probability ratio test decides which side is stronger (or after maxGames), so lopsided
+# pairings only take a few dozen games and the budget goes to the close ones. The pairs
+# need a seed to share boards, so a tournament without one draws a seed of its own.
+#
+# Ratings are computed from all of the games played: Elo updated game by game, and a
+# Bradley-Terry fit (which doesn't depend on the order games were played in).
+#
+#   $ python3 tournament.py AI RANDOM PROB --workers 4 --seed 1
+
+# Log likelihood ratio of "a wins with probability .5 + delta" against ".5 - delta"
+def sprtLLR(wins, losses, delta):
+    p1 = .5 + delta
+    p0 = .5 - delta
+    return wins * math.log(p1 / p0) + losses * math.log((1 - p1) / (1 - p0))
+
+# Wald's bounds on the LLR for error rates alpha (deciding for a when b is stronger) and beta
+def sprtBounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+# Top level so it can be sent to a process pool
+def playPairing(args):
+    a, b, rows, columns, ships, boardBackend, seed, maxGames, alpha, beta, delta = args
+    if seed is None:
+        raise ValueError('both seatings of a pair are only played on the same boards with a seed')
+    lower, upper = sprtBounds(alpha, beta)
+    games = {(a, b): None, (b, a): None}
+    winners = []
+    wins = 0
+    decision = None
+    for pairNum in range(maxGames // 2):
+        pairSeed = gameSeed(seed, '%s:%s:%s' % (a, b, pairNum))
+        for order in [(a, b), (b, a)]:
+            #one Game per seating, reset onto the pair's seed so both games get the same boards
+            if games[order] is None:
+                games[order] = Game(2, list(order), rows, columns, ships, False, seed=pairSeed, boardBackend=boardBackend)
+            else:
+                games[order].reset(pairSeed)
+            gameReport = games[order].playGame()
+            winner = order[gameReport['winnerPlayerNum'] - 1]
+            winners.append(winner)
+            wins += winner == a
+        llr = sprtLLR(wins, len(winners) - wins, delta)
+        if llr >= upper:
+            decision = a
+            break
+        if llr <= lower:
+            decision = b
+            break
+    return {'players': [a, b], 'winners': winners, 'decision': decision}
+
+def eloRatings(pairings, playerTypes, k=16, initial=1500):
+    ratings = dict((playerType, float(initial)) for playerType in playerTypes)
+    for pairing in pairings:
+        a, b = pairing['players']
+        for winner in pairing['winners']:
+            expectedA = 1 / (1 + 10 ** ((ratings[b] - ratings[a]) / 400))
+            scoreA = 1.0 if winner == a else 0.0
+            ratings[a] += k * (scoreA - expectedA)
+            ratings[b] -= k * (scoreA - expectedA)
+    return ratings
+
+def bradleyTerry(pairings, playerTypes, prior=1, iterations=10000, tolerance=1e-10, initial=1500):
+    # Minorization-maximization fit of P(i beats j) = p_i / (p_i + p_j). `prior` virtual games
+    # split evenly between every pair that played keeps a player without wins finite.
+    # Returned on the Elo scale, centered on `initial`.
+    wins = dict((playerType, 0.0) for playerType in playerTypes)
+    games = dict((playerType, {}) for playerType in playerTypes)
+    for pairing in pairings:
+        a, b = pairing['players']
+        numGames = len(pairing['winners']) + prior
+        games[a][b] = games[a].get(b, 0) + numGames
+        games[b][a] = games[b].get(a, 0) + numGames
+        winsA = sum(winner == a for winner in pairing['winners'])
+        wins[a] += winsA + prior / 2
+        wins[b] += len(pairing['winners']) - winsA + prior / 2
+    strength = dict((playerType, 1.0) for playerType in playerTypes)
+    for iteration in range(iterations):
+        updated = {}
+        for i in playerTypes:
+            denominator = sum(n / (strength[i] + strength[j]) for j, n in games[i].items())
+            updated[i] = wins[i] / denominator if denominator else strength[i]
+        logMean = sum(math.log(s) for s in updated.values()) / len(updated)
+        updated = dict((i, s / math.exp(logMean)) for i, s in updated.items())
+        change = max(abs(updated[i] - strength[i]) for i in playerTypes)
+        strength = updated
+        if change < tolerance:
+            break
+    return dict((i, initial + 400 * math.log10(s)) for i, s in strength.items())
+
+
+class Tournament:
+    def __init__(self, playerTypes, rows=8, columns=8, ships=[2,3,3,4,5], maxGames=1000, alpha=.05, beta=.05, delta=.05,
+                    seed=None, workers=1, boardBackend='dense'):
+        if len(playerTypes) < 2 or len(set(playerTypes)) != len(playerTypes) or maxGames < 2 or workers < 1:
+            raise ValueError
+        self.playerTypes = list(playerTypes)
+        self.rows = rows
+        self.columns = columns
+        self.ships = ships
+        self.maxGames = maxGames
+        self.alpha = alpha
+        self.beta = beta
+        self.delta = delta
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**31)
+        self.workers = workers
+        self.boardBackend = boardBackend
+
+    def iterPairings(self):
+        # Yields each pairing's result (in pairing order) as it finishes
+        pairings = [(a, b, self.rows, self.columns, self.ships, self.boardBackend, self.seed,
+                        self.maxGames, self.alpha, self.beta, self.delta)
+                        for a, b in itertools.combinations(self.playerTypes, 2)]
+        if self.workers == 1:
+            for pairing in pairings:
+                yield playPairing(pairing)
+        else:
+            from multiprocessing import Pool
+            with Pool(self.workers) as pool:
+                for result in pool.imap(playPairing, pairings):
+                    yield result
+
+    def run(self):
+        print('seed %s' % self.seed)
+        pairings = []
+        for pairing in self.iterPairings():
+            a, b = pairing['players']
+            winsA = sum(winner == a for winner in pairing['winners'])
+            print('%s vs %s: %s-%s in %s games, %s' % (a, b, winsA, len(pairing['winners']) - winsA, len(pairing['winners']),
+                    'undecided' if pairing['decision'] is None else pairing['decision'] + ' is stronger'))
+            pairings.append(pairing)
+        return {'seed': self.seed,
+                'pairings': pairings,
+                'elo': eloRatings(pairings, self.playerTypes),
+                'bradleyTerry': bradleyTerry(pairings, self.playerTypes)}
+
+def printStandings(results):
+    print('%-16s %8s %8s %8s %8s' % ('player', 'BT', 'Elo', 'wins', 'games'))
+    for playerType in sorted(results['bradleyTerry'], key=results['bradleyTerry'].get, reverse=True):
+        played = [pairing for pairing in results['pairings'] if playerType in pairing['players']]
+        wins = sum(pairing['winners'].count(playerType) for pairing in played)
+        games = sum(len(pairing['winners']) for pairing in played)
+        print('%-16s %8.0f %8.0f %8d %8d' % (playerType, results['bradleyTerry'][playerType], results['elo'][playerType], wins, games))
+
+# Every AI section of a config file that can play, DEFAULT included. Neural sections are
+# left out until ai.py has trained and saved their model.
+def configSections(path='config.ini'):
+    config = configparser.ConfigParser()
+    config.read(path)
+    sections = []
+    for section in ['DEFAULT'] + config.sections():
+        if config[section]['strategy'] == 'neural' and not os.path.exists(config[section]['model']):
+            logger.warning('skipping %s, its model %s has not been trained yet (see ai.py)', section, config[section]['model'])
+            continue
+        sections.append(section)
+    return sections
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Round robin tournament between AI config sections.')
+    parser.add_argument('players', metavar='SECTION', type=str, nargs='*', help='config.ini sections to play (default: all of them)')
+    parser.add_argument('--max-games', type=int, default=1000, help='most games played per pairing')
+    parser.add_argument('--delta', type=float, default=.05, help='SPRT: decide once one side wins more than .5 + delta of the time')
+    parser.add_argument('--alpha', type=float, default=.05, help='SPRT error rate')
+    parser.add_argument('--beta', type=float, default=.05, help='SPRT error rate')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to spread the pairings across')
+    parser.add_argument('--seed', type=int, default=None, help='seed for a reproducible tournament (default: a random one, printed first)')
+    parser.add_argument('--output', type=str, default=None, help='write all of the results as JSON to this file')
+    args = parser.parse_args()
+
+    tournament = Tournament(args.players or configSections(), maxGames=args.max_games, alpha=args.alpha, beta=args.beta,
+                                delta=args.delta, seed=args.seed, workers=args.workers)
+    results = tournament.run()
+    printStandings(results)
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
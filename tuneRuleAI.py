@@ -0,0 +1,230 @@
+import math
+import argparse
+import itertools
+import configparser
+import numpy as np
+
+from game import Game, gameSeed, seededRandom
+from ruleBasedAI import readAIConfig, registerAIConfig
+
+# Hyperparameter search over the RuleAI weights in config.ini.
+#
+# Every candidate plays the same games: game i is seeded with gameSeed(seed, i) whatever the
+# candidate, so the fleets it shoots at are identical (common random numbers). Candidates are
+# then compared by their paired differences in moves per game, which vary far less than the
+# moves themselves, so real differences stand out after a few hundred games rather than
+# thousands.
+#
+# Searches are a full grid, random samples of the grid, or successive halving: every
+# candidate plays a few games, the best 1/eta carry on to eta times as many, and so on.
+# Candidates are config sections registered in memory (registerAIConfig), named TUNEn, built
+# from the base section with the searched keys changed. The base section itself plays the
+# same games as the incumbent, and the winner is only appended to an .ini file as a new
+# section if its paired difference shows it beats the base.
+#
+#   $ python3 tuneRuleAI.py --search halving --candidates 81 --min-games 30 --workers 4 --seed 1 --write config.ini
+
+# Values tried for each weight (any of them can be searched, the rest keep their base values)
+SEARCH_SPACE = {
+    'epsilon': [0, .02, .05, .1],
+    'firstTierHitValue': [.5, 1, 2],
+    'firstTierMissValue': [-2, -1, -.5, 0],
+    'secondTierHitValue': [0, .5, 1],
+    'secondTierMissValue': [-1, -.5, 0],
+    'bothTiersHitValue': [0, .5, 2],
+    'bothTiersMissValue': [-1, -.5, 0],
+    'hitThenUnvisitedValue': [0, 2, 20],
+    'unvisitedThenHitValue': [0, 2],
+    'queueIndex': ['greedy', 'lazy'],
+}
+
+def candidateName(candidateNum):
+    return 'TUNE%s' % candidateNum
+
+# Top level so it can be sent to a process pool
+def playCandidate(args):
+    candidateNum, params, rows, columns, ships, boardBackend, seed, start, stop = args
+    #registered in whichever process plays the games
+    registerAIConfig(candidateName(candidateNum), params)
+    game = None
+    moves = []
+    for i in range(start, stop):
+        if game is None:
+            game = Game(1, [candidateName(candidateNum)], rows, columns, ships, False, seed=gameSeed(seed, i), boardBackend=boardBackend)
+        else:
+            game.reset(gameSeed(seed, i))
+        moves.append(game.playGame()['winnerNumMoves'])
+    return candidateNum, start, moves
+
+# Keys set in a section itself rather than inherited from DEFAULT, with their case as written
+def sectionItems(section, path='config.ini'):
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config.read(path)
+    if section == 'DEFAULT':
+        return {}
+    defaults = config.defaults()
+    return dict((key, value) for key, value in config.items(section, raw=True) if key not in defaults or defaults[key] != value)
+
+def pairedDifference(moves, baseMoves):
+    # Mean and standard error of the per game differences over the games both played
+    n = min(len(moves), len(baseMoves))
+    differences = np.asarray(moves[:n], dtype=float) - np.asarray(baseMoves[:n], dtype=float)
+    standardError = differences.std(ddof=1) / math.sqrt(n) if n > 1 else float('nan')
+    return differences.mean(), standardError
+
+
+class Tuner:
+    def __init__(self, params, base='AI', rows=8, columns=8, ships=[2,3,3,4,5], seed=0, workers=1, chunkSize=50,
+                    boardBackend='dense'):
+        if not params or any(param not in SEARCH_SPACE for param in params) or workers < 1 or chunkSize < 1:
+            raise ValueError
+        if seed is None:
+            raise ValueError('common random numbers need a seed')
+        self.params = list(params)
+        baseConfig = readAIConfig(base)
+        #everything the base section sets (such as openingBook) carries over to the candidates
+        self.baseValues = sectionItems(base)
+        self.baseValues.update((key, baseConfig[key]) for key in SEARCH_SPACE)
+        self.rows = rows
+        self.columns = columns
+        self.ships = ships
+        self.seed = seed
+        self.workers = workers
+        self.chunkSize = chunkSize
+        self.boardBackend = boardBackend
+        # candidate 0 is the base section, every other one is compared with it
+        self.candidates = [dict(self.baseValues)]
+        self.moves = [[]] #moves per game played so far, for each candidate
+
+    def addCandidate(self, values):
+        candidate = dict(self.baseValues)
+        candidate.update((param, str(value)) for param, value in zip(self.params, values))
+        if candidate in self.candidates:
+            return None
+        self.candidates.append(candidate)
+        self.moves.append([])
+        return len(self.candidates) - 1
+
+    def gridCandidates(self):
+        return [candidateNum for candidateNum in (self.addCandidate(values)
+                    for values in itertools.product(*[SEARCH_SPACE[param] for param in self.params]))
+                    if candidateNum is not None]
+
+    def randomCandidates(self, numCandidates, maxAttempts=100):
+        rng = seededRandom(self.seed, 'candidates')
+        added = []
+        for attempt in range(numCandidates * maxAttempts):
+            if len(added) == numCandidates:
+                break
+            candidateNum = self.addCandidate([rng.choice(SEARCH_SPACE[param]) for param in self.params])
+            if candidateNum is not None:
+                added.append(candidateNum)
+        return added
+
+    def play(self, candidateNums, numGames):
+        # Plays every candidate up to numGames games, the games already played are kept
+        tasks = [(candidateNum, self.candidates[candidateNum], self.rows, self.columns, self.ships, self.boardBackend, self.seed,
+                    start, min(start + self.chunkSize, numGames))
+                    for candidateNum in candidateNums
+                    for start in range(len(self.moves[candidateNum]), numGames, self.chunkSize)]
+        if self.workers == 1:
+            results = [playCandidate(task) for task in tasks]
+        else:
+            from multiprocessing import Pool
+            with Pool(self.workers) as pool:
+                results = list(pool.imap(playCandidate, tasks))
+        #chunks come back in order, so each candidate's games stay in seed order
+        for candidateNum, start, moves in results:
+            self.moves[candidateNum].extend(moves)
+
+    def meanMoves(self, candidateNum):
+        return np.mean(self.moves[candidateNum])
+
+    def gridSearch(self, numGames):
+        return self.evaluate(self.gridCandidates(), numGames)
+
+    def randomSearch(self, numCandidates, numGames):
+        return self.evaluate(self.randomCandidates(numCandidates), numGames)
+
+    def evaluate(self, candidateNums, numGames):
+        self.play([0] + candidateNums, numGames)
+        return sorted(candidateNums, key=self.meanMoves)
+
+    def successiveHalving(self, candidateNums, minGames=30, eta=3):
+        if not candidateNums or eta < 2 or minGames < 2:
+            raise ValueError
+        numGames = minGames
+        while True:
+            survivors = self.evaluate(candidateNums, numGames)
+            print('%s candidates after %s games, best %.2f moves' % (len(survivors), numGames, self.meanMoves(survivors[0])))
+            if len(survivors) <= 1:
+                return survivors
+            candidateNums = survivors[:max(1, len(survivors) // eta)]
+            numGames *= eta
+
+    def beatsBase(self, candidateNum, z=1.96):
+        #fewer moves than the base section on the same games, by more than the noise
+        difference, standardError = pairedDifference(self.moves[candidateNum], self.moves[0])
+        return candidateNum != 0 and difference + z * standardError < 0
+
+    def winner(self, ranking):
+        #values of the best ranked candidate if it beats the base section, None otherwise
+        if not ranking or not self.beatsBase(ranking[0]):
+            return None
+        return self.candidates[ranking[0]]
+
+    def printResults(self, ranking, limit=10):
+        print('%-10s %8s %6s %16s  %s' % ('candidate', 'moves', 'games', 'vs base (paired)', ' '.join(self.params)))
+        for candidateNum in [0] + ranking[:limit]:
+            moves = self.moves[candidateNum]
+            difference, standardError = pairedDifference(moves, self.moves[0])
+            print('%-10s %8.2f %6d %+8.2f +/- %5.2f  %s' % ('base' if candidateNum == 0 else candidateName(candidateNum), np.mean(moves), len(moves),
+                    difference, standardError, ' '.join(str(self.candidates[candidateNum][param]) for param in self.params)))
+
+# Appends a section to an .ini file (as text, so the file's comments survive)
+def writeSection(path, section, values):
+    config = configparser.ConfigParser()
+    config.read(path)
+    if config.has_section(section):
+        raise ValueError('%s already has a [%s] section' % (path, section))
+    with open(path, 'a') as outfile:
+        outfile.write('\n[%s]\n' % section)
+        for key, value in values.items():
+            outfile.write('%s = %s\n' % (key, value))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Search the RuleAI weights with common random numbers.')
+    parser.add_argument('--search', type=str, default='halving', choices=['grid', 'random', 'halving'], help='')
+    parser.add_argument('--params', type=str, nargs='+', default=list(SEARCH_SPACE), choices=list(SEARCH_SPACE), help='weights to search')
+    parser.add_argument('--base', type=str, default='AI', help='config section the other weights come from')
+    parser.add_argument('--candidates', type=int, default=81, help='random and halving: candidates sampled from the grid')
+    parser.add_argument('--games', type=int, default=500, help='grid and random: games per candidate')
+    parser.add_argument('--min-games', type=int, default=30, help='halving: games per candidate in the first round')
+    parser.add_argument('--eta', type=int, default=3, help='halving: keep the best 1/eta of the candidates each round')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to play the games')
+    parser.add_argument('--seed', type=int, default=0, help='every candidate plays the games of this seed')
+    parser.add_argument('--section', type=str, default='TUNED', help='name of the section written for the winner')
+    parser.add_argument('--write', type=str, default=None, help='append the winning section to this .ini file')
+    args = parser.parse_args()
+    if args.candidates < 1 or args.games < 2 or args.min_games < 2 or args.eta < 2:
+        parser.error('--candidates must be positive, --games and --min-games at least 2 and --eta at least 2')
+
+    tuner = Tuner(args.params, args.base, seed=args.seed, workers=args.workers)
+    if args.search == 'grid':
+        ranking = tuner.gridSearch(args.games)
+    elif args.search == 'random':
+        ranking = tuner.randomSearch(args.candidates, args.games)
+    else:
+        #only the last round's survivors are ranked, the others played fewer games
+        ranking = tuner.successiveHalving(tuner.randomCandidates(args.candidates), args.min_games, args.eta)
+    tuner.printResults(ranking)
+    winner = tuner.winner(ranking)
+    if winner is None:
+        print('\nnothing beat the %s section, no section written' % args.base)
+    else:
+        print('\n[%s]' % args.section)
+        for key, value in winner.items():
+            print('%s = %s' % (key, value))
+        if args.write:
+            writeSection(args.write, args.section, winner)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from game import Game, gameSeed
+
+# Masked action selection over a (numEnvs, rows*columns) batch, cells already shot are never picked
+def maskedArgmax(q, validActions):
+    return np.argmax(np.where(validActions, q, -np.inf), axis=1)
+
+def randomValidActions(validActions, random=np.random):
+    keys = random.rand(*validActions.shape)
+    keys[~validActions] = -1
+    return np.argmax(keys, axis=1)
+
+class VectorEnv:
+    # numEnvs single player games stepped in lockstep, so one model.predict call
+    # can pick the actions for all of them. Finished games are reset automatically.
+    def __init__(self, numEnvs, playerType, rows, columns, ships, seed=None, boardBackend='dense'):
+        self.numEnvs = numEnvs
+        self.rows = rows
+        self.columns = columns
+        self.numActions = rows * columns
+        self.envs = [Game(1, [playerType], rows, columns, ships, False, seed=gameSeed(seed, i), boardBackend=boardBackend)
+                        for i in range(numEnvs)]
+
+    def observe(self):
+        return np.concatenate([env.board.getGameState() for env in self.envs], axis=0)
+
+    def getValidActions(self):
+        return np.stack([env.board.getValidShotMask() for env in self.envs])
+
+    def reset(self):
+        for env in self.envs:
+            env.reset()
+        return self.observe(), self.getValidActions()
+
+    def step(self, actions):
+        # Returns the states right after the actions (the final state for games that just ended),
+        # the rewards and game over flags, then the states and valid actions to pick the next
+        # actions from (a new game for the ones that ended)
+        nextStates = np.zeros([self.numEnvs, self.numActions])
+        rewards = np.zeros([self.numEnvs,])
+        gameOvers = np.zeros([self.numEnvs,], dtype=bool)
+        for i, env in enumerate(self.envs):
+            nextState, rewards[i], gameOvers[i] = env.act(int(actions[i]))
+            nextStates[i] = nextState
+            if gameOvers[i]:
+                env.reset()
+        return nextStates, rewards, gameOvers, self.observe(), self.getValidActions()
@@ -0,0 +1,211 @@
+import numpy as np
+
+from game import Player, PlayerBoard, seededRandom
+from ruleBasedAI import readAIConfig
+from neuralAI import DenseNetwork
+from placement import PlacementIndex
+
+# Runs many games of battleship at once by stacking the per-game board state
+# along a leading game axis (grid[g] is the grid PlayerBoard would hold for game g)
+
+class VectorizedBoard:
+    def __init__(self, numGames, rows, columns, ships, random=np.random):
+        self.numGames = numGames
+        self.random = random
+        self.rows = rows
+        self.columns = columns
+        self.numShips = len(ships)
+        self.shipLengths = np.array(ships[:], dtype=int)
+        self.lifeCount = np.full([numGames,], sum(ships), dtype=int)
+        self.ships = np.tile(self.shipLengths, (numGames, 1)) #used to keep track of when a particular boat is sunk
+        self.shipsSunk = np.zeros([numGames, self.numShips], dtype=int)
+        self.grid = np.zeros([numGames, rows, columns], dtype=int)
+        self.randomBoatPlacement()
+        self.opponentView = np.zeros([numGames, rows, columns], dtype=float)
+        self.reward = np.zeros([numGames,], dtype=int)
+        self.score = np.zeros([numGames,], dtype=int)
+        self.moves = np.zeros([numGames,], dtype=int)
+        self.sunkShip = np.full([numGames,], -1, dtype=int) #index of the ship sunk by the last shot, -1 if none
+
+    def isGameOver(self):
+        return self.lifeCount == 0
+
+    def shipCells(self, length, startRows, startCols, isVertical):
+        offsets = np.arange(length)
+        cellRows = startRows[:, None] + offsets[None, :] * isVertical[:, None]
+        cellCols = startCols[:, None] + offsets[None, :] * ~isVertical[:, None]
+        return cellRows, cellCols
+
+    def isValidPlacement(self, games, length, startRows, startCols, isVertical):
+        cellRows, cellCols = self.shipCells(length, startRows, startCols, isVertical)
+        inBounds = (cellRows[:, -1] < self.rows) & (cellCols[:, -1] < self.columns)
+        #clip so out of bounds placements can still be indexed, they are rejected by inBounds anyway
+        cellRows = np.minimum(cellRows, self.rows - 1)
+        cellCols = np.minimum(cellCols, self.columns - 1)
+        isFree = (self.grid[games[:, None], cellRows, cellCols] == 0).all(axis=1)
+        return inBounds & isFree
+
+    def placeShip(self, games, length, startRows, startCols, isVertical, type):
+        cellRows, cellCols = self.shipCells(length, startRows, startCols, isVertical)
+        self.grid[games[:, None], cellRows, cellCols] = type
+
+    def randomBoatPlacement(self):
+        # Same rejection sampling as PlacementIndex.sampleFleet, redrawing only the games whose
+        # placement failed. A game that still has no room for a ship after RANDOM_ATTEMPTS draws
+        # gets its whole fleet from sampleFleet instead, which backtracks or raises ValueError.
+        index = PlacementIndex.get(self.rows, self.columns)
+        ships = [int(length) for length in self.shipLengths]
+        index.checkFleet(ships)
+        crowded = np.zeros([self.numGames,], dtype=bool)
+        for i, length in enumerate(ships):
+            type = i + 1
+            pending = np.flatnonzero(~crowded)
+            for attempt in range(PlacementIndex.RANDOM_ATTEMPTS):
+                if not pending.size:
+                    break
+                isVertical = self.random.randint(0, 2, size=pending.size) == 0
+                startRows = self.random.randint(0, self.rows, size=pending.size)
+                startCols = self.random.randint(0, self.columns, size=pending.size)
+                valid = self.isValidPlacement(pending, length, startRows, startCols, isVertical)
+                self.placeShip(pending[valid], length, startRows[valid], startCols[valid], isVertical[valid], type)
+                pending = pending[~valid]
+            crowded[pending] = True
+        for game in np.flatnonzero(crowded):
+            self.grid[game] = 0
+            rng = seededRandom(int(self.random.randint(2**31)), 'placement')
+            for i, (position, heading) in enumerate(index.sampleFleet(ships, rng)):
+                self.placeShip(np.array([game]), ships[i], np.array([position[0]]), np.array([position[1]]),
+                                np.array([heading == 'vertical']), i + 1)
+
+    def isValidShot(self, games, shotRows, shotCols):
+        inBounds = (shotRows >= 0) & (shotRows < self.rows) & (shotCols >= 0) & (shotCols < self.columns)
+        valid = np.zeros(games.shape, dtype=bool)
+        valid[inBounds] = self.grid[games[inBounds], shotRows[inBounds], shotCols[inBounds]] >= 0
+        return valid
+
+    def shoot(self, games, shotRows, shotCols):
+        #one shot per game in games, mirrors PlayerBoard.shoot
+        isHit = np.zeros(games.shape, dtype=bool)
+        self.sunkShip[games] = -1
+        valid = self.isValidShot(games, shotRows, shotCols)
+
+        repeatGames = games[~valid]
+        self.reward[repeatGames] = PlayerBoard.REPEAT_VALUE
+        self.score[repeatGames] += PlayerBoard.REPEAT_VALUE
+
+        games, shotRows, shotCols = games[valid], shotRows[valid], shotCols[valid]
+        self.moves[games] += 1
+        val = self.grid[games, shotRows, shotCols]
+        hit = val != 0
+
+        missGames = games[~hit]
+        self.grid[missGames, shotRows[~hit], shotCols[~hit]] = -(self.numShips+1) #+1 to avoid conflict with boat indices
+        self.opponentView[missGames, shotRows[~hit], shotCols[~hit]] = -1
+        self.reward[missGames] = PlayerBoard.MISS_VALUE
+
+        hitGames = games[hit]
+        hitTypes = val[hit]
+        self.grid[hitGames, shotRows[hit], shotCols[hit]] *= -1
+        self.opponentView[hitGames, shotRows[hit], shotCols[hit]] = 1
+        self.reward[hitGames] = PlayerBoard.HIT_VALUE
+        self.score[hitGames] += PlayerBoard.HIT_VALUE
+        self.lifeCount[hitGames] -= 1
+        self.ships[hitGames, hitTypes-1] -= 1
+        sunk = self.ships[hitGames, hitTypes-1] == 0
+        self.shipsSunk[hitGames[sunk], hitTypes[sunk]-1] = 1
+        self.sunkShip[hitGames[sunk]] = hitTypes[sunk]-1
+
+        isHit[np.flatnonzero(valid)[hit]] = True
+        return isHit
+
+
+class BatchedGame:
+    VECTORIZED_PLAYER_TYPES = ['RANDOM'] #plus every neural player type, whose moves are one forward pass for all of the games
+
+    def __init__(self, numPlayers, playerTypes, numGames, rows, columns, ships, seed=None):
+        if numPlayers not in [1, 2] or len(playerTypes) < numPlayers:
+            raise ValueError
+        self.numPlayers = numPlayers
+        self.playerTypes = playerTypes[:numPlayers]
+        self.numGames = numGames
+        self.rows = rows
+        self.columns = columns
+        self.ships = ships
+        if seed is None:
+            self.random = np.random
+        else:
+            self.random = np.random.RandomState(seededRandom(seed, 'batch').getrandbits(32))
+        self.boards = [VectorizedBoard(numGames, rows, columns, ships, self.random) for _ in range(numPlayers)]
+        #players that can't be vectorized keep one Player object per game
+        self.players = []
+        self.networks = []
+        for number, playerType in enumerate(self.playerTypes, 1):
+            if playerType == 'Human':
+                raise ValueError
+            config = readAIConfig(playerType)
+            isNeural = config['strategy'] == 'neural'
+            self.networks.append(DenseNetwork.get(config['model']) if isNeural else None)
+            if playerType in BatchedGame.VECTORIZED_PLAYER_TYPES or isNeural:
+                self.players.append(None)
+            else:
+                self.players.append([Player(number, playerType, rows, columns, seededRandom(seed, 'game', game, 'player', number), ships)
+                                        for game in range(numGames)])
+
+    def getRandomShots(self, board, games):
+        #uniform over the cells not shot yet, same distribution as a RANDOM RuleAI
+        keys = self.random.rand(games.size, self.rows * self.columns)
+        keys[board.grid[games].reshape(games.size, -1) < 0] = -1
+        cells = np.argmax(keys, axis=1)
+        return cells // self.columns, cells % self.columns
+
+    def getNetworkShots(self, network, board, games):
+        cells = network.bestMoves(board.opponentView[games].reshape(games.size, -1))
+        return cells // self.columns, cells % self.columns
+
+    def getPlayerShots(self, players, board, games):
+        shotRows = np.zeros(games.shape, dtype=int)
+        shotCols = np.zeros(games.shape, dtype=int)
+        grid = board.grid
+        for i, game in enumerate(games):
+            # # Repeat shots allowed to retry
+            #one game at a time, so the same checks as isValidShot without building arrays
+            while True:
+                row, col = players[game].getShot()[:2]
+                if 0 <= row < self.rows and 0 <= col < self.columns and grid[game, row, col] >= 0:
+                    break
+            shotRows[i], shotCols[i] = row, col
+        return shotRows, shotCols
+
+    def executeTurn(self, playerIdx, games):
+        board = self.boards[playerIdx]
+        players = self.players[playerIdx]
+        if self.networks[playerIdx] is not None:
+            shotRows, shotCols = self.getNetworkShots(self.networks[playerIdx], board, games)
+        elif players is None:
+            shotRows, shotCols = self.getRandomShots(board, games)
+        else:
+            shotRows, shotCols = self.getPlayerShots(players, board, games)
+        isHit = board.shoot(games, shotRows, shotCols)
+        if players is not None:
+            for game, shotRow, shotCol, hit in zip(games, shotRows, shotCols, isHit):
+                sunkShip = board.sunkShip[game]
+                players[game].postExecution([int(shotRow), int(shotCol)], hit, None if sunkShip < 0 else int(sunkShip))
+        return board.isGameOver()[games]
+
+    def playGames(self):
+        active = np.ones([self.numGames,], dtype=bool)
+        winnerPlayerNum = np.zeros([self.numGames,], dtype=int)
+        winnerNumMoves = np.zeros([self.numGames,], dtype=int)
+        while active.any():
+            #players alternate like Board.executeTurn, so player 1 wins a game both would finish on the same turn
+            for playerIdx in range(self.numPlayers):
+                games = np.flatnonzero(active)
+                if not games.size:
+                    break
+                gameOver = self.executeTurn(playerIdx, games)
+                finished = games[gameOver]
+                winnerPlayerNum[finished] = playerIdx + 1
+                winnerNumMoves[finished] = self.boards[playerIdx].moves[finished]
+                active[finished] = False
+        return [{'winnerPlayerNum': int(winnerPlayerNum[g]),
+                 'winnerNumMoves': int(winnerNumMoves[g])} for g in range(self.numGames)]